@@ -0,0 +1,80 @@
+import argparse
+import asyncio
+import functools
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.makedirs('logs', exist_ok=True)
+
+from playwright.async_api import async_playwright
+from browser import BrowserManager, USER_AGENT
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_static(directory: str) -> ThreadingHTTPServer:
+    with open(os.path.join(directory, 'index.html'), 'w') as f:
+        rows = ''.join(f'<div class="match-zone-wrapper"><a href="/matches/{i}">match {i}</a></div>' for i in range(500))
+        f.write(f'<html><body>{rows}</body></html>')
+    server = ThreadingHTTPServer(('127.0.0.1', 0), functools.partial(QuietHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def fetch_with_fresh_browser(url: str) -> str:
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            page = await browser.new_page(user_agent=USER_AGENT)
+            await page.goto(url, timeout=60000, wait_until="networkidle")
+            return await page.content()
+        finally:
+            await browser.close()
+
+
+async def throughput(fetch, url: str, fetches: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded():
+        async with semaphore:
+            await fetch(url)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(bounded() for _ in range(fetches)))
+    return fetches / (time.perf_counter() - started)
+
+
+async def run(fetches: int, pool_size: int):
+    with tempfile.TemporaryDirectory() as directory:
+        server = serve_static(directory)
+        url = f'http://127.0.0.1:{server.server_address[1]}/index.html'
+        manager = BrowserManager(pool_size=pool_size)
+
+        results = {}
+        for concurrency in (1, pool_size):
+            before = await throughput(fetch_with_fresh_browser, url, fetches, concurrency)
+            after = await throughput(manager.get_html, url, fetches, concurrency)
+            results[concurrency] = before, after
+
+        await manager.close()
+        server.shutdown()
+
+    for concurrency, (before, after) in results.items():
+        print(f'concurrency {concurrency}: fresh browser per fetch {before:.2f} fetches/sec, '
+              f'shared browser {after:.2f} fetches/sec ({after / before:.1f}x)')
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Compare per-fetch Chromium launch with the shared BrowserManager')
+    arg_parser.add_argument('--fetches', type=int, default=20)
+    arg_parser.add_argument('--pool-size', type=int, default=2)
+    args = arg_parser.parse_args()
+    asyncio.run(run(args.fetches, args.pool_size))
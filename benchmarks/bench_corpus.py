@@ -0,0 +1,172 @@
+import argparse
+import dataclasses
+import hashlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.makedirs('logs', exist_ok=True)
+
+import parser
+from bench_parsers import CASES, FIXTURES, load_fixture
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+MANIFEST = os.path.join(FIXTURES, 'corpus.json')
+GOLDEN = os.path.join(FIXTURES, 'golden')
+RESULTS = os.path.join(BENCHMARKS, 'results')
+
+PARSERS = {
+    'get_all_upcoming_matches': parser.get_all_upcoming_matches,
+    'get_live_matches': parser.get_live_matches,
+    'get_teams': parser.get_teams,
+    'get_stream_urls': parser.get_stream_urls,
+    'get_all_events': parser.get_all_events,
+    'parse_matches_page': parser.parse_matches_page,
+}
+
+
+def to_json(value):
+    if dataclasses.is_dataclass(value):
+        return {field.name: to_json(getattr(value, field.name)) for field in dataclasses.fields(value)}
+    if isinstance(value, dict):
+        return {str(key): to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json(item) for item in value]
+    return value
+
+
+def read_page(name: str) -> bytes:
+    with open(os.path.join(FIXTURES, name), 'rb') as f:
+        return f.read()
+
+
+def check_manifest(manifest: dict) -> list[str]:
+    errors = []
+    for name, page in manifest['pages'].items():
+        digest = hashlib.sha256(read_page(name)).hexdigest()
+        if digest != page['sha256']:
+            errors.append(f"{name} does not match corpus v{manifest['version']}, bump the version and update it")
+    return errors
+
+
+def golden_path(func_name: str) -> str:
+    return os.path.join(GOLDEN, f'{func_name}.json')
+
+
+def cases() -> list[tuple[str, str, str]]:
+    return list(CASES) + [('parse_matches_page', 'matches.html', CASES[0][2])]
+
+
+def check_golden(update: bool) -> dict[str, bool]:
+    results = {}
+    for func_name, fixture, _ in cases():
+        actual = to_json(PARSERS[func_name](read_page(fixture).decode('utf-8')))
+        path = golden_path(func_name)
+        if update:
+            os.makedirs(GOLDEN, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(actual, f, ensure_ascii=False, indent=2, sort_keys=True)
+                f.write('\n')
+        with open(path, encoding='utf-8') as f:
+            results[func_name] = json.load(f) == actual
+    return results
+
+
+def throughput(func, html_content: str, min_time: float) -> dict[str, float]:
+    pages = 0
+    started = time.perf_counter()
+    while True:
+        func(html_content)
+        pages += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_time:
+            break
+    size = len(html_content.encode('utf-8'))
+    return {'bytes': size, 'pages_per_sec': pages / elapsed, 'bytes_per_sec': pages * size / elapsed}
+
+
+def max_rss() -> int:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def rss_probe(func_name: str, path: str):
+    with open(path, encoding='utf-8') as f:
+        html_content = f.read()
+    before = max_rss()
+    PARSERS[func_name](html_content)
+    print(max_rss() - before)
+
+
+def peak_rss(func_name: str, html_content: str) -> int:
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.html') as f:
+        f.write(html_content)
+        f.flush()
+        return int(subprocess.run([sys.executable, os.path.abspath(__file__), '--rss-probe', func_name, f.name],
+                                  capture_output=True, text=True, check=True).stdout)
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCHMARKS, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> bool:
+    with open(MANIFEST, encoding='utf-8') as f:
+        manifest = json.load(f)
+    errors = check_manifest(manifest)
+    for error in errors:
+        print(error)
+
+    # ru_maxrss is inherited across fork and exec, so probe before this process grows
+    rss = {func_name: peak_rss(func_name, load_fixture(fixture, pattern, args.scale))
+           for func_name, fixture, pattern in cases()}
+    golden = check_golden(args.update_golden)
+    if manifest.get('synthetic'):
+        print(f"corpus v{manifest['version']} is synthetic, rows repeated {args.scale} times")
+    report = {'corpus_version': manifest['version'], 'synthetic': manifest.get('synthetic', False),
+              'revision': git_revision(),
+              'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'), 'scale': args.scale,
+              'parsers': {}}
+    print(f"{'parser':<26}{'golden':>8}{'page KiB':>10}{'pages/s':>11}{'MB/s':>8}{'peak RSS KiB':>14}")
+    for func_name, fixture, pattern in cases():
+        stats = throughput(PARSERS[func_name], load_fixture(fixture, pattern, args.scale), args.min_time)
+        stats['peak_rss'] = rss[func_name]
+        report['parsers'][func_name] = {'fixture': fixture, 'golden': golden[func_name], **stats}
+        print(f"{func_name:<26}{'ok' if golden[func_name] else 'FAIL':>8}{stats['bytes'] / 1024:>10.0f}"
+              f"{stats['pages_per_sec']:>11.1f}"
+              f"{stats['bytes_per_sec'] / 1e6:>8.1f}{stats['peak_rss'] / 1024:>14.0f}")
+
+    output = args.output or os.path.join(RESULTS, f"parsers-{report['revision'] or 'local'}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+        f.write('\n')
+    print(f"results written to {output}")
+    return not errors and all(golden.values())
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Golden-output checks and throughput of the parsers on the '
+                                                     'synthetic page corpus')
+    arg_parser.add_argument('--scale', type=int, default=4000,
+                            help='how many times to repeat the row markup; the default makes matches.html about '
+                                 '3 MB, the size of the live /matches/ page')
+    arg_parser.add_argument('--min-time', type=float, default=1.0, help='seconds to spend on each parser')
+    arg_parser.add_argument('--output', help='where to write the JSON results')
+    arg_parser.add_argument('--update-golden', action='store_true', help='re-record the golden outputs')
+    arg_parser.add_argument('--rss-probe', nargs=2, metavar=('PARSER', 'PAGE'), help=argparse.SUPPRESS)
+    args = arg_parser.parse_args()
+    if args.rss_probe:
+        rss_probe(*args.rss_probe)
+        sys.exit(0)
+    sys.exit(0 if run(args) else 1)
@@ -0,0 +1,120 @@
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.makedirs('logs', exist_ok=True)
+
+from models import AsyncDatabaseManager, DatabaseManager
+
+START = (datetime.now(timezone.utc) + timedelta(days=1)).replace(microsecond=0)
+
+
+class SyncCalls:
+    def __init__(self, manager: DatabaseManager):
+        self.manager = manager
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.manager, name)
+
+        async def call(*args, **kwargs):
+            return attr(*args, **kwargs)
+
+        return call
+
+
+def seed(manager: DatabaseManager, teams: int, events: int, users: int):
+    manager.sync_teams([f'Team {i}' for i in range(teams)])
+    manager.sync_events([{'name': f'Event {i}', 'start_date': START, 'end_date': START + timedelta(days=3)}
+                         for i in range(events)])
+    for user_id in range(1, users + 1):
+        manager.create_user(user_id)
+
+
+def match_records(round_no: int, matches: int, teams: int, events: int) -> list[dict]:
+    return [{'event_name': f'Event {i % events}', 'team_names': [f'Team {i % teams}', f'Team {(i + 1) % teams}'],
+             'url': f'https://www.hltv.org/matches/{i}/bench', 'format': f'bo{1 + (i + round_no) % 3}',
+             'ongoing': False, 'start_time': START + timedelta(minutes=i)}
+            for i in range(matches)]
+
+
+async def handle(db, user_id: int, arrival: float, latencies: list[float]):
+    await db.get_timezone(user_id)
+    await db.get_user_subscribed_events(user_id)
+    latencies.append(time.perf_counter() - arrival)
+
+
+async def handler_load(db, users: int, stop: asyncio.Event, latencies: list[float], interval: float):
+    tasks = []
+    arrival = time.perf_counter()
+    while not stop.is_set():
+        while arrival <= time.perf_counter():
+            tasks.append(asyncio.create_task(handle(db, len(tasks) % users + 1, arrival, latencies)))
+            arrival += interval
+        await asyncio.sleep(arrival - time.perf_counter())
+    await asyncio.gather(*tasks)
+
+
+async def bulk_writer(db, rounds: int, matches: int, teams: int, events: int):
+    for round_no in range(rounds):
+        await db.upsert_matches(match_records(round_no, matches, teams, events))
+        await db.sync_teams([f'Team {i}' for i in range(teams + round_no * 50)])
+        await asyncio.sleep(0)
+
+
+async def measure(db, args) -> tuple[list[float], list[float]]:
+    idle, busy = [], []
+    stop = asyncio.Event()
+    task = asyncio.create_task(handler_load(db, args.users, stop, idle, args.interval))
+    await asyncio.sleep(args.idle)
+    stop.set()
+    await task
+
+    stop = asyncio.Event()
+    task = asyncio.create_task(handler_load(db, args.users, stop, busy, args.interval))
+    await bulk_writer(db, args.rounds, args.matches, args.teams, args.events)
+    stop.set()
+    await task
+    return idle, busy
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else 0.0
+
+
+def report(label: str, idle: list[float], busy: list[float]):
+    for phase, values in (('idle', idle), ('bulk write', busy)):
+        print(f"{label:<12} {phase:<11} n={len(values):<5} p50 {statistics.median(values) * 1000:>8.1f} ms   "
+              f"p99 {percentile(values, 0.99) * 1000:>8.1f} ms   max {max(values) * 1000:>8.1f} ms")
+
+
+async def run(args):
+    for label in ('on loop', 'thread pool'):
+        with tempfile.TemporaryDirectory() as directory:
+            manager = DatabaseManager('sqlite:///' + os.path.join(directory, 'bench.db'))
+            seed(manager, args.teams, args.events, args.users)
+            db = SyncCalls(manager) if label == 'on loop' else AsyncDatabaseManager(manager, workers=args.workers)
+            report(label, *await measure(db, args))
+            if isinstance(db, AsyncDatabaseManager):
+                db.close()
+            else:
+                manager.engine.dispose()
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Handler latency while a bulk scrape writes to SQLite')
+    arg_parser.add_argument('--users', type=int, default=200)
+    arg_parser.add_argument('--teams', type=int, default=500)
+    arg_parser.add_argument('--events', type=int, default=300)
+    arg_parser.add_argument('--matches', type=int, default=2000)
+    arg_parser.add_argument('--rounds', type=int, default=5)
+    arg_parser.add_argument('--workers', type=int, default=4)
+    arg_parser.add_argument('--interval', type=float, default=0.01)
+    arg_parser.add_argument('--idle', type=float, default=1.0)
+    asyncio.run(run(arg_parser.parse_args()))
@@ -0,0 +1,68 @@
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.makedirs('logs', exist_ok=True)
+
+import legacy_parser
+import parser
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+CASES = (
+    ('get_all_upcoming_matches', 'matches.html', r'(<div class="match-zone-wrapper".*?\n      </div>\n)'),
+    ('get_live_matches', 'matches.html', r'(<div class="match-wrapper live-match-container".*?\n      </div>\n)'),
+    ('get_teams', 'ranking.html', r'(<div class="ranked-team standard-box">.*?</div></div></div>\n)'),
+    ('get_stream_urls', 'match.html', r'(<div class="stream-box">.*?</div>\n)'),
+    ('get_all_events', 'events.html', r'(<a href="/events/\d+/[\w-]+" class="a-reset small-event standard-box">.*?</a>\n)'),
+)
+
+
+def load_fixture(name: str, pattern: str, scale: int) -> str:
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        html_content = f.read()
+    if scale > 1:
+        html_content = re.sub(pattern, lambda m: m.group(1) * scale, html_content, count=1, flags=re.S)
+    return html_content
+
+
+def measure(func, html_content: str, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(html_content)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(scale: int, repeat: int) -> bool:
+    ok = True
+    print(f"{'parser':<26}{'size':>10}{'rows':>8}{'bs4 ms':>10}{'lxml ms':>10}{'speedup':>9}  equal")
+    for name, fixture, pattern in CASES:
+        html_content = load_fixture(fixture, pattern, scale)
+        old_func, new_func = getattr(legacy_parser, name), getattr(parser, name)
+        expected, actual = old_func(html_content), new_func(html_content)
+        equal = expected == actual
+        ok &= equal
+        old_time, new_time = measure(old_func, html_content, repeat), measure(new_func, html_content, repeat)
+        print(f"{name:<26}{len(html_content):>10}{len(actual):>8}{old_time * 1000:>10.1f}{new_time * 1000:>10.1f}"
+              f"{old_time / new_time:>8.1f}x  {equal}")
+
+    html_content = load_fixture('matches.html', CASES[0][2], scale)
+    old_time = measure(lambda h: (legacy_parser.get_all_upcoming_matches(h), legacy_parser.get_live_matches(h)),
+                       html_content, repeat)
+    new_time = measure(parser.parse_matches_page, html_content, repeat)
+    print(f"{'parse_matches_page':<26}{len(html_content):>10}{'':>8}{old_time * 1000:>10.1f}{new_time * 1000:>10.1f}"
+          f"{old_time / new_time:>8.1f}x")
+    return ok
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Compare the BeautifulSoup parsers with the compiled lxml ones')
+    arg_parser.add_argument('--scale', type=int, default=300, help='how many times to repeat the row markup')
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    args = arg_parser.parse_args()
+    sys.exit(0 if run(args.scale, args.repeat) else 1)
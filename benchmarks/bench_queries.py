@@ -0,0 +1,96 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.makedirs('logs', exist_ok=True)
+
+from sqlalchemy import insert
+from models import (DatabaseManager, Event, Match, Team, User, UserEventSubscription, UserTeamSubscription,
+                    match_team_association)
+
+START = (datetime.now(timezone.utc) + timedelta(days=1)).replace(microsecond=0)
+ADDED_INDEXES = ('ix_match_event_id', 'ix_match_ongoing_notified', 'ix_match_team_team_id', 'ix_stream_match_id',
+                 'ix_user_event_subscription_event_id', 'ix_user_team_subscription_team_id')
+
+
+def sql_recipients(manager: DatabaseManager) -> list[tuple[int, int]]:
+    with manager.SessionLocal() as db:
+        return db.execute(manager._match_recipients_query()).tuples().all()
+
+
+def seed(manager: DatabaseManager, args):
+    rng = random.Random(1)
+    with manager.engine.begin() as connection:
+        connection.execute(insert(Event), [{'id': i, 'name': f'Event {i}', 'start_date': START,
+                                            'end_date': START + timedelta(days=3)} for i in range(1, args.events + 1)])
+        connection.execute(insert(Team), [{'id': i, 'name': f'Team {i}'} for i in range(1, args.teams + 1)])
+        connection.execute(insert(User), [{'id': i, 'time_zone': 0} for i in range(1, args.users + 1)])
+        connection.execute(insert(Match), [{'id': i, 'url': f'https://www.hltv.org/matches/{i}/bench', 'format': 'bo3',
+                                            'event_id': rng.randint(1, args.events), 'ongoing': i % 10 == 0,
+                                            'notified': i % 20 == 0, 'start_time': START + timedelta(minutes=i)}
+                                           for i in range(1, args.matches + 1)])
+        connection.execute(match_team_association.insert(), [
+            {'match_id': i, 'team_id': team_id} for i in range(1, args.matches + 1)
+            for team_id in {rng.randint(1, args.teams), rng.randint(1, args.teams)}
+        ])
+        connection.execute(insert(UserEventSubscription), [
+            {'user_id': user_id, 'event_id': event_id} for user_id in range(1, args.users + 1)
+            for event_id in rng.sample(range(1, args.events + 1), 3)
+        ])
+        connection.execute(insert(UserTeamSubscription), [
+            {'user_id': user_id, 'team_id': team_id} for user_id in range(1, args.users + 1)
+            for team_id in rng.sample(range(1, args.teams + 1), 5)
+        ])
+
+
+def timed(func, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def run(args):
+    for profile in ('default', 'tuned'):
+        with tempfile.TemporaryDirectory() as directory:
+            url = 'sqlite:///' + os.path.join(directory, 'bench.db')
+            manager = DatabaseManager(url, sqlite_pragmas={} if profile == 'default' else None)
+            if profile == 'default':
+                with manager.engine.begin() as connection:
+                    for name in ADDED_INDEXES:
+                        connection.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+            seed(manager, args)
+            rng = random.Random(2)
+            queries = {
+                'matches for user': lambda: manager.get_matches_for_user(rng.randint(1, args.users)),
+                'subscribed teams': lambda: manager.get_user_subscribed_teams(rng.randint(1, args.users)),
+                'match recipients': lambda: len(sql_recipients(manager)),
+                'ongoing matches': manager.get_ongoing_matches,
+                'set match ongoing': lambda: manager.set_match_ongoing(
+                    f'https://www.hltv.org/matches/{rng.randint(1, args.matches)}/bench'
+                ),
+            }
+            print(f"[{profile}]")
+            for label, query in queries.items():
+                timings = timed(query, args.repeat)
+                print(f"  {label:<18} median {statistics.median(timings) * 1000:>9.2f} ms   "
+                      f"max {max(timings) * 1000:>9.2f} ms")
+            manager.engine.dispose()
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Compare default and tuned SQLite engine profiles')
+    arg_parser.add_argument('--users', type=int, default=5000)
+    arg_parser.add_argument('--teams', type=int, default=500)
+    arg_parser.add_argument('--events', type=int, default=300)
+    arg_parser.add_argument('--matches', type=int, default=3000)
+    arg_parser.add_argument('--repeat', type=int, default=20)
+    run(arg_parser.parse_args())
@@ -0,0 +1,113 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.makedirs('logs', exist_ok=True)
+
+from sqlalchemy import insert, update
+from models import (DatabaseManager, Event, Match, Team, User, UserEventSubscription, UserTeamSubscription,
+                    match_team_association)
+from subscribers import SubscriberIndex
+
+START = (datetime.now(timezone.utc) + timedelta(days=1)).replace(microsecond=0)
+
+
+def sql_recipients(manager: DatabaseManager) -> list[tuple[int, int]]:
+    with manager.SessionLocal() as db:
+        return db.execute(manager._match_recipients_query()).tuples().all()
+
+
+def seed(manager: DatabaseManager, args):
+    rng = random.Random(1)
+    with manager.engine.begin() as connection:
+        connection.execute(insert(Event), [{'id': i, 'name': f'Event {i}', 'start_date': START,
+                                            'end_date': START + timedelta(days=3)} for i in range(1, args.events + 1)])
+        connection.execute(insert(Team), [{'id': i, 'name': f'Team {i}'} for i in range(1, args.teams + 1)])
+        connection.execute(insert(User), [{'id': i, 'time_zone': 0} for i in range(1, args.users + 1)])
+        connection.execute(insert(Match), [{'id': i, 'url': f'https://www.hltv.org/matches/{i}/bench', 'format': 'bo3',
+                                            'event_id': rng.randint(1, args.events), 'ongoing': True,
+                                            'notified': False, 'start_time': START}
+                                           for i in range(1, args.matches + 1)])
+        connection.execute(match_team_association.insert(), [
+            {'match_id': i, 'team_id': team_id} for i in range(1, args.matches + 1)
+            for team_id in rng.sample(range(1, args.teams + 1), 2)
+        ])
+        connection.execute(insert(UserEventSubscription), [
+            {'user_id': user_id, 'event_id': event_id} for user_id in range(1, args.users + 1)
+            for event_id in rng.sample(range(1, args.events + 1), args.per_user_events)
+        ])
+        connection.execute(insert(UserTeamSubscription), [
+            {'user_id': user_id, 'team_id': team_id} for user_id in range(1, args.users + 1)
+            for team_id in rng.sample(range(1, args.teams + 1), args.per_user_teams)
+        ])
+
+
+def run(args):
+    with tempfile.TemporaryDirectory() as directory:
+        manager = DatabaseManager('sqlite:///' + os.path.join(directory, 'bench.db'))
+        started = time.perf_counter()
+        seed(manager, args)
+        print(f"seeded {args.users} users in {time.perf_counter() - started:.1f}s")
+
+        index = SubscriberIndex()
+        started = time.perf_counter()
+        index.load(*manager.get_subscription_pairs())
+        print(f"index loaded in {(time.perf_counter() - started) * 1000:.0f} ms: {index}")
+
+        fresh = SubscriberIndex()
+        fresh.load(*manager.get_subscription_pairs())
+        fresh.add_team(1, 1)
+        fresh.remove_event(2, next(event_id for event_id in range(1, args.events + 1)
+                                   if 2 in fresh.recipients(event_id, ())))
+        started = time.perf_counter()
+        diff = index.diff(fresh)
+        print(f"consistency check against a copy with two injected changes in "
+              f"{(time.perf_counter() - started) * 1000:.1f} ms: {diff}")
+
+        sql_timings, index_timings = [], []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            expected = defaultdict(set)
+            for match_id, user_id in sql_recipients(manager):
+                expected[match_id].add(user_id)
+            sql_timings.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            pending = manager.get_pending_matches()
+            resolved = {match_id: index.recipients(event_id, team_ids) for match_id, event_id, team_ids in pending}
+            index_timings.append(time.perf_counter() - started)
+
+            assert {match_id: users for match_id, users in resolved.items() if users} == dict(expected)
+
+        total = sum(len(users) for users in resolved.values())
+        print(f"{len(resolved)} live matches, {total} recipients")
+        print(f"sql join     median {sorted(sql_timings)[len(sql_timings) // 2] * 1000:>8.1f} ms")
+        print(f"memory index median {sorted(index_timings)[len(index_timings) // 2] * 1000:>8.1f} ms")
+
+        started = time.perf_counter()
+        for user_id in range(1, 1001):
+            index.add_team(user_id, 1)
+            index.remove_team(user_id, 1)
+        print(f"1000 subscribe/unsubscribe pairs in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+        with manager.engine.begin() as connection:
+            connection.execute(update(Match).values(notified=True))
+        manager.engine.dispose()
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Resolve match recipients via SQL and via the in-memory index')
+    arg_parser.add_argument('--users', type=int, default=100000)
+    arg_parser.add_argument('--teams', type=int, default=500)
+    arg_parser.add_argument('--events', type=int, default=300)
+    arg_parser.add_argument('--matches', type=int, default=20)
+    arg_parser.add_argument('--per-user-events', type=int, default=3)
+    arg_parser.add_argument('--per-user-teams', type=int, default=5)
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    run(arg_parser.parse_args())
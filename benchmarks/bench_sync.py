@@ -0,0 +1,58 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.makedirs('logs', exist_ok=True)
+
+from models import DatabaseManager
+
+START = (datetime.now(timezone.utc) + timedelta(days=1)).replace(microsecond=0)
+
+
+def make_data(teams: int, events: int, shift: int) -> tuple[list[str], list[dict]]:
+    team_names = [f'Team {i}' for i in range(teams)]
+    event_records = [{'name': f'Event {i}',
+                      'start_date': START + timedelta(days=i % 30),
+                      'end_date': START + timedelta(days=i % 30 + 3 + (shift if i % 3 == 0 else 0))}
+                     for i in range(events)]
+    return team_names, event_records
+
+
+def per_row_sync(db_manager: DatabaseManager, team_names: list[str], event_records: list[dict]):
+    for team in team_names:
+        db_manager.create_team(team)
+    for event in event_records:
+        db_manager.update_event(**event)
+    db_manager.delete_ended_events()
+
+
+def set_based_sync(db_manager: DatabaseManager, team_names: list[str], event_records: list[dict]):
+    db_manager.sync_teams(team_names)
+    db_manager.sync_events(event_records)
+
+
+def run(teams: int, events: int):
+    for label, sync in (('per-row', per_row_sync), ('set-based', set_based_sync)):
+        with tempfile.TemporaryDirectory() as directory:
+            db_manager = DatabaseManager('sqlite:///' + os.path.join(directory, 'bench.db'))
+            timings = []
+            for shift in (0, 0, 1):
+                team_names, event_records = make_data(teams, events, shift)
+                started = time.perf_counter()
+                sync(db_manager, team_names, event_records)
+                timings.append(time.perf_counter() - started)
+            db_manager.engine.dispose()
+        print(f"{label:<10} initial {timings[0] * 1000:>9.1f} ms   unchanged {timings[1] * 1000:>9.1f} ms   "
+              f"1/3 changed {timings[2] * 1000:>9.1f} ms")
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Compare per-row and set-based team/event sync on SQLite')
+    arg_parser.add_argument('--teams', type=int, default=500)
+    arg_parser.add_argument('--events', type=int, default=300)
+    args = arg_parser.parse_args()
+    run(args.teams, args.events)
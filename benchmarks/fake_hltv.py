@@ -0,0 +1,139 @@
+import argparse
+import asyncio
+import random
+import time
+from html import escape
+from aiohttp import web
+
+PAGE = '''<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>{title} | HLTV.org</title></head>
+<body>
+<div class="contentCol">
+{body}
+</div>
+</body>
+</html>
+'''
+
+LIVE_MATCH = '''      <div class="match-wrapper live-match-container" data-livescore-match="{id}">
+        <a href="/matches/{id}/{slug}" class="match-top a-reset"></a>
+        <div class="match-event text-ellipsis"><div class="text-ellipsis">{event}</div></div>
+        <div class="match-meta">{format}</div>
+        <div class="match-teams">
+          <div class="match-team"><div class="match-teamname text-ellipsis">{team1}</div></div>
+          <div class="match-team"><div class="match-teamname text-ellipsis">{team2}</div></div>
+        </div>
+      </div>
+'''
+
+UPCOMING_MATCH = '''      <div class="match-zone-wrapper" data-zonedgrouping-entry-unix="{start}">
+        <div class="match" data-match-id="{id}">
+          <a href="/matches/{id}/{slug}" class="match-info a-reset">
+            <div class="match-time" data-unix="{start}">00:00</div>
+            <div class="match-meta">{format}</div>
+            <div class="match-team team1"><div class="match-teamname text-ellipsis">{team1}</div></div>
+            <div class="match-team team2"><div class="match-teamname text-ellipsis">{team2}</div></div>
+            <div class="match-event" data-event-headline="{event}"><div class="text-ellipsis">{event}</div></div>
+          </a>
+        </div>
+      </div>
+'''
+
+EVENT = '''        <a href="/events/{id}/event-{id}" class="a-reset ongoing-event">
+          <div class="content">
+            <div class="text-ellipsis">{name}</div>
+            <span class="col-desc"><span><span data-unix="{start}">start</span><span> - <span data-unix="{end}">end</span></span></span></span>
+          </div>
+        </a>
+'''
+
+TEAM = '''    <div class="ranked-team standard-box"><div class="ranking-header"><span class="position">#{position}</span><div class="teamLine"><span class="name">{name}</span><span class="points">(1 points)</span></div></div></div>
+'''
+
+STREAM = '''      <div class="stream-box"><div class="stream-box-embed" data-stream-embed="https://player.twitch.tv/?channel=fake{match}_{index}">Stream {index}</div></div>
+'''
+
+
+class FakeHLTV:
+    def __init__(self, events: int = 20, teams: int = 200, upcoming: int = 90, live: int = 10, streams: int = 2,
+                 latency: float = 0.0, seed: int = 1):
+        self.events = [f'Fake Event {i}' for i in range(1, events + 1)]
+        self.teams = [f'Fake Team {i}' for i in range(1, teams + 1)]
+        self.streams = streams
+        self.latency = latency
+        self.requests = 0
+        rng = random.Random(seed)
+        now = int(time.time())
+        self.matches = []
+        for i in range(live + upcoming):
+            team1, team2 = rng.sample(self.teams, 2)
+            self.matches.append({'id': 3000000 + i, 'slug': f'fake-match-{i}', 'event': rng.choice(self.events),
+                                 'team1': team1, 'team2': team2, 'format': rng.choice(('bo1', 'bo3')),
+                                 'live': i < live, 'start': (now + 3600 + i * 600) * 1000})
+        self._pages = {
+            '/matches/': self._render_matches(),
+            '/events': self._render_events(now),
+            '/ranking/teams/': self._render_teams(),
+        }
+
+    def _render_matches(self) -> str:
+        live = ''.join(LIVE_MATCH.format(**{k: escape(str(v)) for k, v in match.items()})
+                       for match in self.matches if match['live'])
+        upcoming = ''.join(UPCOMING_MATCH.format(**{k: escape(str(v)) for k, v in match.items()})
+                           for match in self.matches if not match['live'])
+        body = (f'  <div class="matches-list-column">\n    <div class="liveMatches">\n{live}    </div>\n'
+                f'    <div class="matches-list-section">\n{upcoming}    </div>\n  </div>')
+        return PAGE.format(title='CS2 Matches', body=body)
+
+    def _render_events(self, now: int) -> str:
+        events = ''.join(EVENT.format(id=i, name=escape(name), start=(now - 86400) * 1000,
+                                      end=(now + 10 * 86400) * 1000)
+                         for i, name in enumerate(self.events, 1))
+        body = (f'  <div id="ALL" class="tab-content">\n    <div class="events-holder">\n'
+                f'      <div class="ongoing-events-holder">\n{events}      </div>\n    </div>\n  </div>')
+        return PAGE.format(title='CS2 Events', body=body)
+
+    def _render_teams(self) -> str:
+        teams = ''.join(TEAM.format(position=i, name=escape(name)) for i, name in enumerate(self.teams, 1))
+        return PAGE.format(title='CS2 Ranking', body=f'  <div class="ranking">\n{teams}  </div>')
+
+    def _render_match(self, match_id: int) -> str:
+        streams = ''.join(STREAM.format(match=match_id, index=i) for i in range(1, self.streams + 1))
+        body = f'  <div class="match-page">\n    <div class="streams">\n{streams}    </div>\n  </div>'
+        return PAGE.format(title=f'Match {match_id}', body=body)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        path = request.path
+        if path in self._pages:
+            return web.Response(text=self._pages[path], content_type='text/html')
+        if path.startswith('/matches/'):
+            try:
+                match_id = int(path.split('/')[2])
+            except (IndexError, ValueError):
+                raise web.HTTPNotFound()
+            return web.Response(text=self._render_match(match_id), content_type='text/html')
+        raise web.HTTPNotFound()
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/{tail:.*}', self.handle)
+        return app
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Serve generated HLTV-like pages for local load testing')
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=8765)
+    arg_parser.add_argument('--events', type=int, default=20)
+    arg_parser.add_argument('--teams', type=int, default=200)
+    arg_parser.add_argument('--upcoming', type=int, default=90)
+    arg_parser.add_argument('--live', type=int, default=10)
+    arg_parser.add_argument('--streams', type=int, default=2)
+    arg_parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    args = arg_parser.parse_args()
+    fake = FakeHLTV(args.events, args.teams, args.upcoming, args.live, args.streams, args.latency)
+    web.run_app(fake.app(), host=args.host, port=args.port)
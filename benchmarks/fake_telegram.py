@@ -0,0 +1,57 @@
+import argparse
+import asyncio
+import itertools
+import random
+import time
+from aiohttp import web
+
+
+class FakeTelegram:
+    def __init__(self, latency: float = 0.0, error_rate: float = 0.0, seed: int = 1):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.sent = 0
+        self.errors = 0
+        self.calls: dict[str, int] = {}
+        self._message_ids = itertools.count(1)
+        self._random = random.Random(seed)
+
+    def _reply(self, result) -> web.Response:
+        return web.json_response({'ok': True, 'result': result})
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info['method']
+        self.calls[method] = self.calls.get(method, 0) + 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        data = dict(await request.post())
+        if method == 'getMe':
+            return self._reply({'id': 1, 'is_bot': True, 'first_name': 'Fake', 'username': 'fake_bot'})
+        if method == 'getUpdates':
+            await asyncio.sleep(min(float(data.get('timeout') or 0), 1.0))
+            return self._reply([])
+        if method == 'sendMessage':
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.errors += 1
+                return web.json_response({'ok': False, 'error_code': 500, 'description': 'Internal Server Error'},
+                                         status=500)
+            self.sent += 1
+            chat_id = int(data['chat_id'])
+            return self._reply({'message_id': next(self._message_ids), 'date': int(time.time()),
+                                'chat': {'id': chat_id, 'type': 'private'}, 'text': data.get('text', '')})
+        return self._reply(True)
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post('/bot{token}/{method}', self.handle)
+        return app
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='Minimal Telegram Bot API stand-in for load testing')
+    arg_parser.add_argument('--host', default='127.0.0.1')
+    arg_parser.add_argument('--port', type=int, default=8081)
+    arg_parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    arg_parser.add_argument('--error-rate', type=float, default=0.0, help='share of sendMessage calls that fail')
+    args = arg_parser.parse_args()
+    web.run_app(FakeTelegram(args.latency, args.error_rate).app(), host=args.host, port=args.port)
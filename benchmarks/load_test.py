@@ -0,0 +1,180 @@
+import argparse
+import asyncio
+import functools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from aiohttp import web
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS))
+
+from fake_hltv import FakeHLTV
+from fake_telegram import FakeTelegram
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class ServerThread(threading.Thread):
+    def __init__(self, app: web.Application, port: int):
+        super().__init__(daemon=True)
+        self.app = app
+        self.port = port
+        self.ready = threading.Event()
+
+    def run(self):
+        loop = asyncio.new_event_loop()
+        runner = web.AppRunner(self.app, access_log=None)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, '127.0.0.1', self.port).start())
+        self.ready.set()
+        loop.run_forever()
+
+
+class Timer:
+    def __init__(self):
+        self.seconds = 0.0
+        self.calls = 0
+
+    def wrap(self, func):
+        @functools.wraps(func)
+        async def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                self.seconds += time.perf_counter() - started
+                self.calls += 1
+        return timed
+
+
+def seed_users(db_manager, users: int, events: int, teams: int):
+    from sqlalchemy import insert
+    from models import User, UserEventSubscription, UserTeamSubscription
+    rng = random.Random(2)
+    with db_manager.manager.engine.begin() as connection:
+        connection.execute(insert(User), [{'id': user_id, 'time_zone': 0} for user_id in range(1, users + 1)])
+        connection.execute(insert(UserTeamSubscription), [
+            {'user_id': user_id, 'team_id': team_id} for user_id in range(1, users + 1)
+            for team_id in rng.sample(range(1, teams + 1), 2)
+        ])
+        connection.execute(insert(UserEventSubscription), [
+            {'user_id': user_id, 'event_id': rng.randint(1, events)} for user_id in range(1, users + 1)
+        ])
+
+
+async def run_scenario(args) -> dict:
+    live = max(1, args.matches // 10)
+    hltv = FakeHLTV(events=args.events, teams=args.teams, upcoming=args.matches - live, live=live,
+                    streams=args.streams, latency=args.hltv_latency)
+    telegram = FakeTelegram(latency=args.telegram_latency)
+    hltv_port, telegram_port = free_port(), free_port()
+    for app, port in ((hltv.app(), hltv_port), (telegram.app(), telegram_port)):
+        server = ServerThread(app, port)
+        server.start()
+        server.ready.wait()
+
+    directory = tempfile.mkdtemp(prefix='hltv-load-')
+    os.environ.update({
+        'TOKEN': '123456:FAKE',
+        'HLTV_BASE_URL': f'http://127.0.0.1:{hltv_port}',
+        'TELEGRAM_API_URL': f'http://127.0.0.1:{telegram_port}',
+        'DATABASE_URL': 'sqlite:///' + os.path.join(directory, 'app.db'),
+        'PAGE_CACHE_PATH': os.path.join(directory, 'page_cache.db'),
+        'FETCH_TIERS': 'http',
+        'TELEGRAM_GLOBAL_RATE': str(args.send_rate),
+        'TELEGRAM_CHAT_INTERVAL': '0',
+    })
+    os.makedirs('logs', exist_ok=True)
+    import main
+    from bot import drain_outbox, sync_subscribers
+
+    fetch_timer, db_timer = Timer(), Timer()
+    main.fetcher.get_page = fetch_timer.wrap(main.fetcher.get_page)
+    for name in dir(main.db_manager.manager):
+        if not name.startswith('_') and callable(getattr(main.db_manager.manager, name)):
+            setattr(main.db_manager, name, db_timer.wrap(getattr(main.db_manager, name)))
+
+    started = time.perf_counter()
+    await main.update_teams_events()
+    catalog_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    await asyncio.get_running_loop().run_in_executor(None, seed_users, main.db_manager, args.users, args.events,
+                                                     args.teams)
+    await sync_subscribers()
+    seed_seconds = time.perf_counter() - started
+
+    fetch_timer.seconds = db_timer.seconds = 0.0
+    started = time.perf_counter()
+    await main.update_data()
+    cycle_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    sent_before = telegram.sent
+    while telegram.sent - sent_before < args.send_limit:
+        if not await drain_outbox():
+            break
+    send_seconds = time.perf_counter() - started
+    sent = telegram.sent - sent_before
+
+    await main.fetcher.close()
+    await main.bot.session.close()
+    main.db_manager.close()
+    return {'matches': args.matches, 'users': args.users, 'live': live, 'catalog_seconds': catalog_seconds,
+            'seed_seconds': seed_seconds, 'cycle_seconds': cycle_seconds, 'fetch_seconds': fetch_timer.seconds,
+            'fetch_calls': fetch_timer.calls, 'db_seconds': db_timer.seconds, 'db_calls': db_timer.calls,
+            'sent': sent, 'send_errors': telegram.errors, 'send_seconds': send_seconds,
+            'sends_per_second': sent / send_seconds if send_seconds else 0.0, 'hltv_requests': hltv.requests}
+
+
+def run_all(args) -> list[dict]:
+    results = []
+    print(f"{'matches':>8}{'users':>8}{'cycle s':>9}{'fetch s':>9}{'db s':>8}{'sent':>8}{'msg/s':>9}")
+    for matches in args.match_counts:
+        for users in args.user_counts:
+            command = [sys.executable, os.path.abspath(__file__), '--scenario', str(matches), str(users),
+                       '--events', str(args.events), '--teams', str(args.teams), '--streams', str(args.streams),
+                       '--hltv-latency', str(args.hltv_latency), '--telegram-latency', str(args.telegram_latency),
+                       '--send-rate', str(args.send_rate), '--send-limit', str(args.send_limit)]
+            output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            results.append(result)
+            print(f"{matches:>8}{users:>8}{result['cycle_seconds']:>9.2f}{result['fetch_seconds']:>9.2f}"
+                  f"{result['db_seconds']:>8.2f}{result['sent']:>8}{result['sends_per_second']:>9.0f}")
+    return results
+
+
+if __name__ == '__main__':
+    arg_parser = argparse.ArgumentParser(description='End-to-end scrape, database and mailing load test against '
+                                                     'local HLTV and Telegram stand-ins')
+    arg_parser.add_argument('--scenario', nargs=2, type=int, metavar=('MATCHES', 'USERS'),
+                            help='run a single scenario in this process and print its JSON result')
+    arg_parser.add_argument('--match-counts', nargs='+', type=int, default=[10, 100, 1000])
+    arg_parser.add_argument('--user-counts', nargs='+', type=int, default=[1000, 100000])
+    arg_parser.add_argument('--events', type=int, default=20)
+    arg_parser.add_argument('--teams', type=int, default=200)
+    arg_parser.add_argument('--streams', type=int, default=2)
+    arg_parser.add_argument('--hltv-latency', type=float, default=0.05)
+    arg_parser.add_argument('--telegram-latency', type=float, default=0.02)
+    arg_parser.add_argument('--send-rate', type=float, default=1000, help='global Telegram rate limit to use')
+    arg_parser.add_argument('--send-limit', type=int, default=5000, help='stop draining the outbox after this many')
+    arg_parser.add_argument('--output', help='write all results to this JSON file')
+    args = arg_parser.parse_args()
+    if args.scenario:
+        args.matches, args.users = args.scenario
+        print(json.dumps(asyncio.run(run_scenario(args))))
+    else:
+        results = run_all(args)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
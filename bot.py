@@ -1,19 +1,61 @@
 from aiogram import Bot, Dispatcher, types, F
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 from aiogram.filters.command import Command
 from config import Config
-from models import DatabaseManager
+from models import AsyncDatabaseManager, DatabaseManager
+from catalog import CatalogCache
+from profiles import ProfileCache
+from subscribers import SubscriberIndex
+from profiler import Profiler, UPDATE_CYCLE
 from kbs import *
 from logger import logger
+from notifier import DeliveryStats, Notifier
+from metrics import HANDLER_ERRORS, HANDLER_SECONDS, MESSAGES_TOTAL, NOTIFICATIONS_QUEUED, OUTBOX_LAG_GAUGE, \
+    OUTBOX_PENDING_GAUGE, SEND_SECONDS
+import asyncio
+import os
+import tempfile
+import time
 from datetime import timedelta, datetime
+from collections import defaultdict
 
-bot = Bot(token=Config.TOKEN)
+bot = Bot(token=Config.TOKEN,
+          session=AiohttpSession(api=TelegramAPIServer.from_base(Config.TELEGRAM_API_URL))
+          if Config.TELEGRAM_API_URL else None)
 dp = Dispatcher()
-db_manager = DatabaseManager(Config.SQLALCHEMY_DATABASE_URI)
+db_manager = AsyncDatabaseManager(DatabaseManager(Config.SQLALCHEMY_DATABASE_URI, sqlite_pragmas=Config.SQLITE_PRAGMAS,
+                                                  pool_size=Config.DB_POOL_SIZE), workers=Config.DB_WORKERS)
+catalog = CatalogCache(db_manager)
+profiles = ProfileCache(db_manager, max_entries=Config.PROFILE_CACHE_SIZE, ttl=Config.PROFILE_CACHE_TTL)
+subscribers = SubscriberIndex()
+profiler = Profiler(Config.PROFILE_DIR, sample_interval=Config.PROFILE_SAMPLE_INTERVAL)
+notifier = Notifier(bot, workers=Config.NOTIFIER_WORKERS, global_rate=Config.TELEGRAM_GLOBAL_RATE,
+                    chat_interval=Config.TELEGRAM_CHAT_INTERVAL)
+outbox_ready = asyncio.Event()
+mailing_lock = asyncio.Lock()
+KB_ON_PAGE = 6
+
+async def handler_metrics(handler, event, data):
+    name = getattr(data.get('handler'), 'callback', handler).__name__
+    started = time.perf_counter()
+    try:
+        async with profiler.run(name):
+            return await handler(event, data)
+    except Exception:
+        HANDLER_ERRORS.inc(handler=name)
+        raise
+    finally:
+        HANDLER_SECONDS.observe(time.perf_counter() - started, handler=name)
+
+dp.message.middleware(handler_metrics)
+dp.callback_query.middleware(handler_metrics)
 
 @dp.message(Command('start'))
 async def start(message: types.Message):
     logger.info(f"start called by {message.from_user.id}")
-    db_manager.create_user(message.from_user.id)
+    await db_manager.create_user(message.from_user.id)
+    profiles.invalidate(message.from_user.id)
     answer = f"Привет, {message.from_user.first_name}.\nЭтот бот уведомляет о меропрятиях на HLTV"
     await message.answer(answer, reply_markup=basic_kb())
 
@@ -28,51 +70,45 @@ async def to_base(callback: types.CallbackQuery):
     logger.info(f"to_base called by {callback.from_user.id}")
     await start(callback.message)
 
+async def catalog_markup(name: str, prefix: str, page: int, after_id: int | None,
+                         before_id: int | None) -> types.InlineKeyboardMarkup | None:
+    key = (name, catalog.versions[name], page, prefix, after_id, before_id)
+    markup = get_cached_kb(key)
+    if markup is not None:
+        return markup
+    rows, total = await catalog.page(name, KB_ON_PAGE, after_id=after_id, before_id=before_id,
+                                     offset=page * KB_ON_PAGE)
+    if not rows:
+        return None
+    return cache_kb(key, catalog_page_kb([(row.id, row.name) for row in rows], prefix, page, total, KB_ON_PAGE))
+
 @dp.callback_query(F.data == 'all_events')
-async def all_events(callback: types.CallbackQuery, page=0):
+async def all_events(callback: types.CallbackQuery, page=0, after_id=None, before_id=None):
     logger.info(f"all_events called by {callback.from_user.id}")
     try:
-        events = db_manager.get_all_events()
-        if not events:
+        markup = await catalog_markup('events', 'event-s', page, after_id, before_id)
+        if not markup:
             await callback.answer("Турниры не найдены")
             return
 
         answer = "<b>Все турниры:</b>"
-        events_d = {}
-        for event in events:
-            events_d[event.id] = {
-                'message': event.name,
-                'prefix': 'event-s'
-            }
-
-        await callback.message.edit_text(answer,
-                                         reply_markup=enum_call_kb(events_d, page=page, kb_on_page=6),
-                                         parse_mode='HTML')
+        await callback.message.edit_text(answer, reply_markup=markup, parse_mode='HTML')
 
     except Exception as e:
         logger.error(f"get all_events error {e}")
         await callback.answer("Произошла ошибка при получении списка турниров")
 
 @dp.callback_query(F.data == 'all_teams')
-async def all_teams(callback: types.CallbackQuery, page=0):
+async def all_teams(callback: types.CallbackQuery, page=0, after_id=None, before_id=None):
     logger.info(f"all_teams called by {callback.from_user.id}")
     try:
-        teams = db_manager.get_all_teams()
-        if not teams:
+        markup = await catalog_markup('teams', 'team-s', page, after_id, before_id)
+        if not markup:
             await callback.answer("Команды не найдены")
             return
 
         answer = "<b>Все команды:</b>"
-        teams_d = {}
-        for team in teams:
-            teams_d[team.id] = {
-                'message': team.name,
-                'prefix': 'team-s'
-            }
-
-        await callback.message.edit_text(answer,
-                                         reply_markup=enum_call_kb(teams_d, page=page, kb_on_page=6),
-                                         parse_mode='HTML')
+        await callback.message.edit_text(answer, reply_markup=markup, parse_mode='HTML')
 
     except Exception as e:
         logger.error(f"get all_teams error {e}")
@@ -81,11 +117,14 @@ async def all_teams(callback: types.CallbackQuery, page=0):
 @dp.callback_query(F.data.startswith("_"))
 async def change_page(callback: types.CallbackQuery):
     logger.info(f"change_page called by {callback.from_user.id}")
-    funk, command, page = callback.data[1:].split('_')
+    funk, command, page, *cursor = callback.data[1:].split('_')
+    page = int(page) + (1 if command == 'forward' else -1)
+    after_id = int(cursor[0]) if cursor and command == 'forward' else None
+    before_id = int(cursor[0]) if cursor and command == 'back' else None
     if 'event' in funk:
-        await all_events(callback, int(page) + (1 if command == 'forward' else -1))
+        await all_events(callback, page, after_id, before_id)
     elif 'team' in funk:
-        await all_teams(callback, int(page) + (1 if command == 'forward' else -1))
+        await all_teams(callback, page, after_id, before_id)
 
 @dp.callback_query(F.data.startswith("sub_"))
 async def subscribe(callback: types.CallbackQuery):
@@ -93,9 +132,13 @@ async def subscribe(callback: types.CallbackQuery):
     _, sub_to, id = callback.data.split('_')
     name = ''
     if sub_to == 'event':
-        name = db_manager.subscribe_user_to_event(callback.from_user.id, int(id))
+        name = await profiles.subscribe_to_event(callback.from_user.id, int(id))
+        if name:
+            subscribers.add_event(callback.from_user.id, int(id))
     elif sub_to == 'team':
-        name = db_manager.subscribe_user_to_team(callback.from_user.id, int(id))
+        name = await profiles.subscribe_to_team(callback.from_user.id, int(id))
+        if name:
+            subscribers.add_team(callback.from_user.id, int(id))
 
     if name:
         await callback.answer(f"Вы подписались на все матчи {name}")
@@ -108,9 +151,11 @@ async def unsubscribe(callback: types.CallbackQuery):
     _, unsub_from, id = callback.data.split('_')
     name = ''
     if unsub_from == 'event':
-        name = db_manager.unsubscribe_user_from_event(callback.from_user.id, int(id))
+        name = await profiles.unsubscribe_from_event(callback.from_user.id, int(id))
+        subscribers.remove_event(callback.from_user.id, int(id))
     elif unsub_from == 'team':
-        name = db_manager.unsubscribe_user_from_team(callback.from_user.id, int(id))
+        name = await profiles.unsubscribe_from_team(callback.from_user.id, int(id))
+        subscribers.remove_team(callback.from_user.id, int(id))
 
     if name:
         await callback.answer(f"Вы отписались от матчей")
@@ -124,53 +169,59 @@ async def show_data(callback: types.CallbackQuery):
     answer = '.'
     call_back_sub = '.'
     call_back_back = 'base'
-    timezone = timedelta(hours=db_manager.get_timezone(callback.from_user.id))
+    timezone = timedelta(hours=await profiles.get_timezone(callback.from_user.id))
     if 'event' in prefix:
-        event = db_manager.get_event_by_id(int(id))
+        event = await catalog.event(int(id))
+        if not event:
+            await callback.answer("Турнир не найден")
+            return
         start_date = (event.start_date + timezone).strftime('%d.%m.%Y') if event.start_date else 'дата не указана'
         end_date = (event.end_date + timezone).strftime('%d.%m.%Y') if event.end_date else 'дата не указана'
         answer = f'<b>{event.name}</b>\n{start_date} - {end_date}'
         call_back_sub = f'sub_event_{event.id}' if prefix[-1] == 's' else f'unsub_event_{event.id}'
         call_back_back = 'all_events' if prefix[-1] == 's' else 'show_sub_events'
     elif 'team' in prefix:
-        team = db_manager.get_team_by_id(int(id))
+        team = await catalog.team(int(id))
+        if not team:
+            await callback.answer("Команда не найдена")
+            return
         answer = f'<b>{team.name}</b>'
         call_back_sub = f'sub_team_{team.id}' if prefix[-1] == 's' else f'unsub_team_{team.id}'
         call_back_back = 'all_teams' if prefix[-1] == 's' else 'show_sub_teams'
     await callback.message.edit_text(answer, reply_markup=sub_kb(call_back_sub, call_back_back), parse_mode='HTML')
 
+def chunk_message(header: str, lines: list[str], limit: int = 4096) -> list[str]:
+    chunks = []
+    parts = [header]
+    size = len(header)
+    for line in lines:
+        if size + len(line) >= limit:
+            chunks.append(''.join(parts))
+            parts = []
+            size = 0
+        parts.append(line)
+        size += len(line)
+    if parts:
+        chunks.append(''.join(parts))
+    return chunks
+
 @dp.callback_query(F.data == 'my_matches')
 async def my_matches(callback: types.CallbackQuery):
     logger.info(f"my_matches called by {callback.from_user.id}")
     try:
-        matches = db_manager.get_matches_for_user(callback.from_user.id)
+        matches = await db_manager.get_matches_for_user(callback.from_user.id, Config.MY_MATCHES_LIMIT)
         if not matches:
             await callback.answer("Матчи не найдены")
             return
 
-        timezone = timedelta(hours=db_manager.get_timezone(callback.from_user.id))
-
-        matches_sorted = sorted(
-            matches,
-            key=lambda m: (
-                (m.start_time + timezone)
-                if m.start_time
-                else datetime.min
-            )
-        )
-
-        answer = "<b>Ближайшие матчи:</b>\n\n"
-
-        for match in matches_sorted:
-            start_time = (match.start_time + timezone).strftime('%d-%m-%Y %H:%M') if match.start_time else 'уже начался'
-            line = f"• <b>{match.event.name}</b>\n{' - '.join([team.name for team in match.teams])}\n{start_time}\n\n"
+        timezone = timedelta(hours=await profiles.get_timezone(callback.from_user.id))
 
-            if len(answer + line) >= 4096:
-                await callback.message.answer(answer, parse_mode='HTML', reply_markup=back_kb('to_base'))
-                answer = ""
-            answer += line
+        lines = []
+        for start_time, event_name, team_names in matches:
+            start_time = (start_time + timezone).strftime('%d-%m-%Y %H:%M') if start_time else 'уже начался'
+            lines.append(f"• <b>{event_name}</b>\n{' - '.join(team_names)}\n{start_time}\n\n")
 
-        if answer:
+        for answer in chunk_message("<b>Ближайшие матчи:</b>\n\n", lines):
             await callback.message.answer(answer, parse_mode='HTML', reply_markup=back_kb('to_base'))
 
     except Exception as e:
@@ -180,7 +231,7 @@ async def my_matches(callback: types.CallbackQuery):
 @dp.callback_query(F.data == 'profile')
 async def profile(callback: types.CallbackQuery):
     logger.info(f"callback called by {callback.from_user.id}")
-    time_zone = db_manager.get_timezone(callback.from_user.id)
+    time_zone = await profiles.get_timezone(callback.from_user.id)
     time_zone = str(time_zone) if time_zone < 0 else '+' + str(time_zone)
     await callback.message.edit_text(f"/time_zone <число> - установить часовой пояс\nтекущий часовой пояс: {time_zone}\nПодписки: ", reply_markup=subscribe_kb())
 
@@ -189,7 +240,7 @@ async def time_zone(message: types.Message):
     logger.info(f"time_zone called by {message.from_user.id}")
     timezone = message.text.split()[1]
     if timezone.isdigit():
-        if db_manager.set_timezone(message.from_user.id, int(timezone)):
+        if await profiles.set_timezone(message.from_user.id, int(timezone)):
             await message.answer("часовой пояс успешно установлен")
             return
     await message.answer("произошла ошибка")
@@ -200,50 +251,156 @@ async def show_subscribes(callback: types.CallbackQuery):
     _, _, prefix = callback.data.split('_')
     _d = {}
     sub_name = 'турниры' if prefix == 'events' else 'команды'
+    profile = await profiles.get(callback.from_user.id)
     if prefix == 'events':
-        events = db_manager.get_user_subscribed_events(callback.from_user.id)
-        for event in events:
+        for event_id in sorted(profile.event_ids):
+            event = await catalog.event(event_id)
+            if not event:
+                continue
             _d[event.id] = {
                 'message': event.name,
                 'prefix': 'event-u'
             }
     elif prefix == 'teams':
-        teams = db_manager.get_user_subscribed_teams(callback.from_user.id)
-        for team in teams:
+        for team_id in sorted(profile.team_ids):
+            team = await catalog.team(team_id)
+            if not team:
+                continue
             _d[team.id] = {
                 'message': team.name,
                 'prefix': 'team-u'
             }
 
     await callback.message.edit_text(f"Ваши подписки на {sub_name}:",
-                     reply_markup=enum_call_kb(_d, page=0, kb_on_page=6, call_back_back='profile'))
+                     reply_markup=enum_call_kb(_d, page=0, kb_on_page=KB_ON_PAGE, call_back_back='profile'))
 
 @dp.message(Command('logs'))
 async def send_logs(message: types.Message):
     logger.info(f"send_logs called by {message.from_user.id}")
-    if db_manager.check_user_is_admin(message.from_user.id):
+    if await profiles.is_admin(message.from_user.id):
         file = types.FSInputFile(r'logs/logs.log')
         await message.answer_document(document=file)
 
 @dp.message(Command('db'))
 async def send_db(message: types.Message):
     logger.info(f"send_db called by {message.from_user.id}")
-    if db_manager.check_user_is_admin(message.from_user.id):
-        file = types.FSInputFile(r'data/app.db')
-        await message.answer_document(document=file)
+    if await profiles.is_admin(message.from_user.id):
+        with tempfile.TemporaryDirectory() as directory:
+            path = await db_manager.export_sqlite(os.path.join(directory, 'app.db'))
+            await message.answer_document(document=types.FSInputFile(path))
+
+@dp.message(Command('profile'))
+async def start_profiling(message: types.Message):
+    logger.info(f"start_profiling called by {message.from_user.id}")
+    if await profiles.is_admin(message.from_user.id):
+        args = message.text.split()
+        target = args[1] if len(args) > 1 else UPDATE_CYCLE
+        profiler.arm(target)
+        await message.answer(f"профилирование {target} начнётся при следующем запуске, результат: /profile_files")
+
+@dp.message(Command('profile_files'))
+async def send_profile_files(message: types.Message):
+    logger.info(f"send_profile_files called by {message.from_user.id}")
+    if await profiles.is_admin(message.from_user.id):
+        if not profiler.last_files:
+            await message.answer("профилей пока нет")
+            return
+        for path in profiler.last_files:
+            await message.answer_document(document=types.FSInputFile(path))
+
+async def match_message(match) -> tuple[str, types.InlineKeyboardMarkup]:
+    message = f"Турнир: {match.event.name}\nКоманды: {' - '.join([team.name for team in match.teams])}\nФормат: {match.format}\nСтраница на HLTV: {match.url}"
+    stream_d = {}
+    for stream in await db_manager.get_streams_for_match(match.url):
+        stream_d[stream.name] = stream.link
+    return message, enum_links_kb(stream_d)
 
 async def mailing():
     logger.info(f"start mailing")
-    matches = db_manager.get_ongoing_matches()
-    for match in matches:
-        if match.notified:
+    async with mailing_lock:
+        if subscribers.loaded:
+            pending = await db_manager.get_pending_matches()
+            queued = await db_manager.enqueue_recipients({
+                match_id: subscribers.recipients(event_id, team_ids) for match_id, event_id, team_ids in pending
+            })
+        else:
+            queued = await db_manager.enqueue_notifications()
+    NOTIFICATIONS_QUEUED.inc(queued)
+    logger.info(f"queued {queued} notifications")
+    if queued:
+        outbox_ready.set()
+
+async def sync_subscribers():
+    version = subscribers.version
+    event_pairs, team_pairs = await db_manager.get_subscription_pairs()
+    fresh = SubscriberIndex()
+    await asyncio.get_running_loop().run_in_executor(None, fresh.load, event_pairs, team_pairs)
+    if subscribers.version != version:
+        logger.info("subscriptions changed while checking the subscriber index, retrying later")
+        return
+    if not subscribers.loaded:
+        subscribers.replace(fresh)
+        logger.info(f"{subscribers} loaded")
+        return
+    diff = subscribers.diff(fresh)
+    if diff['missing'] or diff['extra']:
+        logger.warning(f"subscriber index out of sync with the database: {diff}, reloading")
+        subscribers.replace(fresh)
+    else:
+        logger.info(f"{subscribers} consistent with the database")
+
+async def drain_outbox() -> int:
+    batch = await db_manager.get_outbox_batch(Config.OUTBOX_BATCH_SIZE)
+    if not batch:
+        return 0
+    by_match = defaultdict(dict)
+    for row_id, match_id, user_id in batch:
+        by_match[match_id][user_id] = row_id
+
+    stats = DeliveryStats()
+    retryable = 0
+    for match_id, rows in by_match.items():
+        match = await db_manager.get_match_by_id(match_id)
+        if not match:
+            await db_manager.mark_outbox_failed([(row_id, 'match deleted', True) for row_id in rows.values()],
+                                                Config.NOTIFY_MAX_RETRIES)
             continue
-        users = db_manager.get_users_subscribed_to_match(match.url)
-        message = f"Турнир: {match.event.name}\nКоманды: {' - '.join([team.name for team in match.teams])}\nФормат: {match.format}\nСтраница на HLTV: {match.url}"
-        for user in users:
-            streams = db_manager.get_streams_for_match(match.url)
-            stream_d = {}
-            for stream in streams:
-                stream_d[stream.name] = stream.link
-            await bot.send_message(user.id, message, reply_markup=enum_links_kb(stream_d))
-        db_manager.set_notifed_match(match.url)
\ No newline at end of file
+        message, keyboard = await match_message(match)
+
+        async def record(user_id: int, failure: tuple[str, bool] | None):
+            if failure is None:
+                await db_manager.mark_outbox_sent([rows[user_id]])
+            else:
+                await db_manager.mark_outbox_failed([(rows[user_id], *failure)], Config.NOTIFY_MAX_RETRIES)
+
+        failures = await notifier.send(message, keyboard, list(rows), stats, on_result=record)
+        retryable += sum(1 for _, _, permanent in failures if not permanent)
+
+    MESSAGES_TOTAL.inc(stats.sent, result='sent')
+    MESSAGES_TOTAL.inc(stats.failed, result='failed')
+    MESSAGES_TOTAL.inc(stats.throttled, result='throttled')
+    for latency in stats.latencies:
+        SEND_SECONDS.observe(latency)
+    pending, lag = await db_manager.get_outbox_lag()
+    OUTBOX_PENDING_GAUGE.set(pending)
+    OUTBOX_LAG_GAUGE.set(lag)
+    logger.info(f"outbox batch of {len(batch)} delivered: {stats}, {pending} pending, lag {lag:.0f}s")
+    return len(batch) - retryable
+
+async def outbox_sender():
+    last_purge = datetime.now()
+    while True:
+        delivered = 0
+        try:
+            delivered = await drain_outbox()
+            if datetime.now() - last_purge > timedelta(hours=1):
+                await db_manager.purge_outbox(timedelta(days=Config.OUTBOX_RETENTION_DAYS))
+                last_purge = datetime.now()
+        except Exception as err:
+            logger.error(f"Error in outbox_sender {err}")
+        if not delivered:
+            outbox_ready.clear()
+            try:
+                await asyncio.wait_for(outbox_ready.wait(), timeout=Config.OUTBOX_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,102 @@
+import asyncio
+from playwright.async_api import async_playwright, Browser, Page, Playwright
+from config import Config
+from logger import logger
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+
+class BrowserManager:
+    def __init__(self, pool_size: int = 2, page_max_uses: int = 50, user_agent: str = USER_AGENT):
+        self.pool_size = pool_size
+        self.page_max_uses = page_max_uses
+        self.user_agent = user_agent
+        self._playwright: Playwright | None = None
+        self._browser: Browser | None = None
+        self._generation = 0
+        self._idle_pages: list[Page] = []
+        self._page_uses: dict[Page, int] = {}
+        self._slots = asyncio.Semaphore(pool_size)
+        self._lock = asyncio.Lock()
+
+    def is_healthy(self) -> bool:
+        return self._browser is not None and self._browser.is_connected()
+
+    async def _launch(self):
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=True)
+        self._generation += 1
+        logger.info(f"browser launched, generation {self._generation}")
+
+    async def _close_browser(self):
+        for page in self._idle_pages:
+            self._page_uses.pop(page, None)
+        self._idle_pages.clear()
+        if self._browser:
+            try:
+                await self._browser.close()
+            except Exception as e:
+                logger.error(f"Error closing browser {e}")
+        self._browser = None
+
+    async def _ensure_browser(self):
+        if self.is_healthy():
+            return
+        async with self._lock:
+            if self.is_healthy():
+                return
+            if self._browser:
+                logger.warning("browser is disconnected, relaunching")
+            await self._close_browser()
+            await self._launch()
+
+    async def _acquire_page(self) -> tuple[Page, int]:
+        await self._ensure_browser()
+        generation = self._generation
+        while self._idle_pages:
+            page = self._idle_pages.pop()
+            if not page.is_closed():
+                return page, generation
+            self._page_uses.pop(page, None)
+        context = await self._browser.new_context(user_agent=self.user_agent)
+        page = await context.new_page()
+        self._page_uses[page] = 0
+        return page, generation
+
+    async def _release_page(self, page: Page, generation: int, broken: bool):
+        uses = self._page_uses.get(page, 0) + 1
+        reusable = (not broken and generation == self._generation and self.is_healthy()
+                    and not page.is_closed() and uses < self.page_max_uses)
+        if reusable:
+            self._page_uses[page] = uses
+            self._idle_pages.append(page)
+            return
+        self._page_uses.pop(page, None)
+        try:
+            await page.context.close()
+        except Exception:
+            pass
+
+    async def get_html(self, url: str, timeout: int = 60000, wait_until: str = "networkidle") -> str:
+        async with self._slots:
+            page, generation = await self._acquire_page()
+            broken = True
+            try:
+                await page.goto(url, timeout=timeout, wait_until=wait_until)
+                html_content = await page.content()
+                broken = False
+                return html_content
+            finally:
+                await self._release_page(page, generation, broken)
+
+    async def close(self):
+        async with self._lock:
+            await self._close_browser()
+            if self._playwright:
+                await self._playwright.stop()
+                self._playwright = None
+        logger.info("browser closed")
+
+
+browser_manager = BrowserManager(pool_size=Config.BROWSER_POOL_SIZE, page_max_uses=Config.BROWSER_PAGE_MAX_USES)
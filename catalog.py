@@ -0,0 +1,88 @@
+import asyncio
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Awaitable, Callable, NamedTuple
+
+
+class EventRow(NamedTuple):
+    id: int
+    name: str
+    start_date: datetime | None
+    end_date: datetime | None
+
+
+class TeamRow(NamedTuple):
+    id: int
+    name: str
+
+
+class CatalogCache:
+    def __init__(self, db_manager):
+        self._loaders: dict[str, tuple[Callable[[], Awaitable[list[tuple]]], type]] = {
+            'events': (db_manager.get_event_rows, EventRow),
+            'teams': (db_manager.get_team_rows, TeamRow),
+        }
+        self.versions = {name: 0 for name in self._loaders}
+        self._rows: dict[str, tuple] = {}
+        self._by_id: dict[str, dict[int, tuple]] = {}
+        self._ids: dict[str, list[int]] = {}
+        self._lock = asyncio.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self, *names: str):
+        for name in names or self._loaders:
+            self.versions[name] += 1
+            self._rows.pop(name, None)
+            self._by_id.pop(name, None)
+            self._ids.pop(name, None)
+
+    async def _load(self, name: str) -> tuple:
+        rows = self._rows.get(name)
+        if rows is not None:
+            self.hits += 1
+            return rows
+        async with self._lock:
+            rows = self._rows.get(name)
+            if rows is not None:
+                self.hits += 1
+                return rows
+            self.misses += 1
+            version = self.versions[name]
+            loader, row_type = self._loaders[name]
+            rows = tuple(row_type(*row) for row in await loader())
+            if version == self.versions[name]:
+                self._rows[name] = rows
+                self._by_id[name] = {row.id: row for row in rows}
+                self._ids[name] = [row.id for row in rows]
+            return rows
+
+    async def _get(self, name: str, id: int) -> tuple | None:
+        rows = await self._load(name)
+        by_id = self._by_id.get(name)
+        if by_id is None:
+            return next((row for row in rows if row.id == id), None)
+        return by_id.get(id)
+
+    async def page(self, name: str, limit: int, after_id: int | None = None, before_id: int | None = None,
+                   offset: int = 0) -> tuple[tuple, int]:
+        rows = await self._load(name)
+        ids = self._ids.get(name)
+        if ids is None:
+            ids = [row.id for row in rows]
+        if after_id is not None:
+            start = bisect_right(ids, after_id)
+        elif before_id is not None:
+            start = max(0, bisect_left(ids, before_id) - limit)
+        else:
+            start = offset
+        return rows[start:start + limit], len(rows)
+
+    async def event(self, id: int) -> EventRow | None:
+        return await self._get('events', id)
+
+    async def team(self, id: int) -> TeamRow | None:
+        return await self._get('teams', id)
+
+    def __str__(self):
+        return f"catalog cache: {self.hits} hits, {self.misses} misses, versions {self.versions}"
@@ -9,5 +9,55 @@ if os.path.exists(dotenv_path):
 class Config:
     TOKEN = os.environ.get('TOKEN')
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///' + os.path.join(basedir, 'data/app.db')
-    ADMIN_ID = os.environ.get('ADMIN_ID')
-    BASE_DIR = os.path.abspath(os.path.dirname(__file__))
\ No newline at end of file
+    ADMIN_ID = int(os.environ.get('ADMIN_ID') or 0) or None
+    BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+    BROWSER_POOL_SIZE = int(os.environ.get('BROWSER_POOL_SIZE', 2))
+    BROWSER_PAGE_MAX_USES = int(os.environ.get('BROWSER_PAGE_MAX_USES', 50))
+    STREAM_FETCH_CONCURRENCY = int(os.environ.get('STREAM_FETCH_CONCURRENCY', 4))
+    FETCH_TIERS = os.environ.get('FETCH_TIERS', 'http,cloudscraper,browser')
+    HTTP_POOL_SIZE = int(os.environ.get('HTTP_POOL_SIZE', 8))
+    PAGE_CACHE_PATH = os.environ.get('PAGE_CACHE_PATH') or os.path.join(basedir, 'data/page_cache.db')
+    PAGE_CACHE_MAX_ENTRIES = int(os.environ.get('PAGE_CACHE_MAX_ENTRIES', 256))
+    PAGE_CACHE_TTL_MATCHES = int(os.environ.get('PAGE_CACHE_TTL_MATCHES', 60))
+    PAGE_CACHE_TTL_CATALOG = int(os.environ.get('PAGE_CACHE_TTL_CATALOG', 60 * 60 * 6))
+    NOTIFIER_WORKERS = int(os.environ.get('NOTIFIER_WORKERS', 8))
+    TELEGRAM_GLOBAL_RATE = float(os.environ.get('TELEGRAM_GLOBAL_RATE', 25))
+    TELEGRAM_CHAT_INTERVAL = float(os.environ.get('TELEGRAM_CHAT_INTERVAL', 1.0))
+    NOTIFY_MAX_RETRIES = int(os.environ.get('NOTIFY_MAX_RETRIES', 5))
+    OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', 500))
+    OUTBOX_POLL_INTERVAL = float(os.environ.get('OUTBOX_POLL_INTERVAL', 30))
+    OUTBOX_RETENTION_DAYS = int(os.environ.get('OUTBOX_RETENTION_DAYS', 3))
+    STREAM_FETCH_ATTEMPTS = int(os.environ.get('STREAM_FETCH_ATTEMPTS', 3))
+    PAGE_FETCH_ATTEMPTS = int(os.environ.get('PAGE_FETCH_ATTEMPTS', 5))
+    MATCH_NOTIFY_LEAD = int(os.environ.get('MATCH_NOTIFY_LEAD', 60 * 3))
+    MATCHES_REFRESH_INTERVAL = int(os.environ.get('MATCHES_REFRESH_INTERVAL', 60 * 30))
+    CATALOG_REFRESH_INTERVAL = int(os.environ.get('CATALOG_REFRESH_INTERVAL', 60 * 60 * 24))
+    SCHEDULER_MIN_INTERVAL = float(os.environ.get('SCHEDULER_MIN_INTERVAL', 30))
+    SCHEDULER_JITTER = float(os.environ.get('SCHEDULER_JITTER', 0.1))
+    LIVE_POLL_FAST = float(os.environ.get('LIVE_POLL_FAST', 60))
+    LIVE_POLL_NORMAL = float(os.environ.get('LIVE_POLL_NORMAL', 120))
+    LIVE_POLL_SLOW = float(os.environ.get('LIVE_POLL_SLOW', 60 * 10))
+    LIVE_POLL_SOON_WINDOW = float(os.environ.get('LIVE_POLL_SOON_WINDOW', 60 * 15))
+    DB_WORKERS = int(os.environ.get('DB_WORKERS', 4))
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+    SQLITE_PRAGMAS = {
+        'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -64000)),
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)),
+        'foreign_keys': 'ON',
+    }
+    PROFILE_CACHE_SIZE = int(os.environ.get('PROFILE_CACHE_SIZE', 10000))
+    PROFILE_CACHE_TTL = float(os.environ.get('PROFILE_CACHE_TTL', 60 * 10))
+    MY_MATCHES_LIMIT = int(os.environ.get('MY_MATCHES_LIMIT', 50))
+    SUBSCRIBER_CHECK_INTERVAL = int(os.environ.get('SUBSCRIBER_CHECK_INTERVAL', 60 * 60))
+    HLTV_BASE_URL = os.environ.get('HLTV_BASE_URL', 'https://www.hltv.org').rstrip('/')
+    TELEGRAM_API_URL = os.environ.get('TELEGRAM_API_URL')
+    METRICS_HOST = os.environ.get('METRICS_HOST', '127.0.0.1')
+    METRICS_PORT = int(os.environ.get('METRICS_PORT', 9108))
+    METRICS_LOG_INTERVAL = int(os.environ.get('METRICS_LOG_INTERVAL', 60 * 15))
+    PROFILE_DIR = os.environ.get('PROFILE_DIR') or os.path.join(basedir, 'data/profiles')
+    PROFILE_SAMPLE_INTERVAL = float(os.environ.get('PROFILE_SAMPLE_INTERVAL', 0.005))
+    PROFILE_NEXT_CYCLE = os.environ.get('PROFILE_NEXT_CYCLE', '').lower() in ('1', 'true', 'yes')
+    PROFILE_HANDLER = os.environ.get('PROFILE_HANDLER')
\ No newline at end of file
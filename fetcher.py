@@ -0,0 +1,198 @@
+import asyncio
+import functools
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import aiohttp
+import cloudscraper
+from browser import USER_AGENT
+from config import Config
+from logger import logger
+from metrics import FETCH_BYTES, FETCH_SECONDS, FETCH_TOTAL, page_kind
+from page_cache import CachedPage, PageCache, content_hash
+from parser import getting_html_with_playwright
+
+TIERS = ('http', 'cloudscraper', 'browser')
+
+PAGE_MARKERS = (
+    ('/ranking/teams', ('ranked-team',)),
+    ('/events', ('ongoing-event', 'big-event-info', 'small-event')),
+    ('/matches', ('match-zone-wrapper', 'liveMatches')),
+)
+MATCH_PAGE_MARKERS = ('stream-box',)
+CATALOG_PAGES = ('/ranking/teams', '/events')
+
+
+def markers_for_url(url: str) -> tuple[str, ...]:
+    path = urlsplit(url).path.rstrip('/')
+    for page_path, markers in PAGE_MARKERS:
+        if path == page_path:
+            return markers
+    if path.startswith('/matches/'):
+        return MATCH_PAGE_MARKERS
+    return ()
+
+
+def ttl_for_url(url: str) -> int:
+    if urlsplit(url).path.rstrip('/') in CATALOG_PAGES:
+        return Config.PAGE_CACHE_TTL_CATALOG
+    return Config.PAGE_CACHE_TTL_MATCHES
+
+
+def has_markers(html_content: str | None, markers: tuple[str, ...]) -> bool:
+    if not html_content:
+        return False
+    if not markers:
+        return True
+    return any(marker in html_content for marker in markers)
+
+
+class Fetcher:
+    def __init__(self, tiers: tuple[str, ...] = TIERS, cache: PageCache | None = None, timeout: int = 30,
+                 max_tracked_urls: int = 500):
+        self.tiers = tiers
+        self.cache = cache
+        self.timeout = timeout
+        self.max_tracked_urls = max_tracked_urls
+        self._session: aiohttp.ClientSession | None = None
+        self._scraper = None
+        self._stats: OrderedDict[str, dict] = OrderedDict()
+        self._applied: OrderedDict[str, str] = OrderedDict()
+        self._tier_seconds = {tier: 0.0 for tier in TIERS}
+        self._cache_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='page-cache')
+
+    async def _cache_call(self, method, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._cache_executor, functools.partial(method, *args, **kwargs))
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=Config.HTTP_POOL_SIZE, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={
+                    'User-Agent': USER_AGENT,
+                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                    'Accept-Encoding': 'gzip, deflate',
+                    'Accept-Language': 'en-US,en;q=0.9',
+                },
+            )
+        return self._session
+
+    async def _fetch_http(self, url: str, cached: CachedPage | None) -> tuple[str | None, dict]:
+        headers = {}
+        if cached and cached.etag:
+            headers['If-None-Match'] = cached.etag
+        if cached and cached.last_modified:
+            headers['If-Modified-Since'] = cached.last_modified
+        async with self._get_session().get(url, headers=headers) as response:
+            if response.status == 304 and cached:
+                return cached.body, {'not_modified': True}
+            if response.status != 200:
+                logger.info(f"http tier got status {response.status} for {url}")
+                return None, {}
+            return await response.text(), {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+            }
+
+    async def _fetch_cloudscraper(self, url: str, cached: CachedPage | None) -> tuple[str | None, dict]:
+        if self._scraper is None:
+            self._scraper = cloudscraper.create_scraper()
+
+        def get() -> str | None:
+            response = self._scraper.get(url, timeout=self.timeout)
+            return response.text if response.status_code == 200 else None
+
+        return await asyncio.get_running_loop().run_in_executor(None, get), {}
+
+    async def _fetch_browser(self, url: str, cached: CachedPage | None) -> tuple[str | None, dict]:
+        return await getting_html_with_playwright(url), {}
+
+    def _record(self, url: str, tier: str, seconds: float):
+        stats = self._stats.get(url)
+        if stats is None:
+            stats = self._stats[url] = {tier: 0 for tier in TIERS + ('cached', 'failed')}
+            if len(self._stats) > self.max_tracked_urls:
+                self._stats.popitem(last=False)
+        self._stats.move_to_end(url)
+        stats[tier] += 1
+        if tier in self._tier_seconds:
+            self._tier_seconds[tier] += seconds
+
+    async def get_page(self, url: str, markers: tuple[str, ...] | None = None) -> tuple[str | None, bool]:
+        cached = await self._cache_call(self.cache.get, url) if self.cache is not None else None
+        if cached and cached.age() < ttl_for_url(url):
+            self._record(url, 'cached', 0)
+            FETCH_TOTAL.inc(tier='cache', page=page_kind(url), result='hit')
+            return cached.body, self._applied.get(url) != cached.content_hash
+
+        if markers is None:
+            markers = markers_for_url(url)
+        kind = page_kind(url)
+        fetchers = {
+            'http': self._fetch_http,
+            'cloudscraper': self._fetch_cloudscraper,
+            'browser': self._fetch_browser,
+        }
+        for tier in self.tiers:
+            started = time.perf_counter()
+            try:
+                html_content, meta = await fetchers[tier](url, cached)
+            except Exception as e:
+                logger.info(f"{tier} tier failed for {url}: {e}")
+                html_content, meta = None, {}
+            elapsed = time.perf_counter() - started
+            FETCH_SECONDS.observe(elapsed, tier=tier, page=kind)
+            if (tier == 'browser' and html_content) or has_markers(html_content, markers):
+                self._record(url, tier, elapsed)
+                FETCH_TOTAL.inc(tier=tier, page=kind, result='not_modified' if meta.get('not_modified') else 'ok')
+                FETCH_BYTES.inc(len(html_content), tier=tier, page=kind)
+                logger.info(f"page {url} fetched with {tier} tier in {elapsed:.1f}s")
+                if self.cache is None:
+                    return html_content, self._applied.get(url) != content_hash(html_content)
+                if meta.get('not_modified'):
+                    await self._cache_call(self.cache.touch, url)
+                    return html_content, self._applied.get(url) != cached.content_hash
+                page = await self._cache_call(self.cache.put, url, html_content, etag=meta.get('etag'),
+                                              last_modified=meta.get('last_modified'))
+                return html_content, self._applied.get(url) != page.content_hash
+            FETCH_TOTAL.inc(tier=tier, page=kind, result='failed')
+            logger.info(f"{tier} tier returned no usable page for {url}, escalating")
+        self._record(url, 'failed', 0)
+        return None, True
+
+    def mark_applied(self, url: str, html_content: str):
+        self._applied[url] = content_hash(html_content)
+        self._applied.move_to_end(url)
+        if len(self._applied) > self.max_tracked_urls:
+            self._applied.popitem(last=False)
+
+    async def forget(self, url: str):
+        if self.cache is not None:
+            await self._cache_call(self.cache.forget, url)
+
+    def stats(self) -> dict[str, dict]:
+        return {url: dict(stats) for url, stats in self._stats.items()}
+
+    def summary(self) -> str:
+        totals = {tier: 0 for tier in TIERS + ('cached', 'failed')}
+        for stats in self._stats.values():
+            for tier, count in stats.items():
+                totals[tier] += count
+        parts = [f"{tier}={totals[tier]} ({self._tier_seconds.get(tier, 0):.1f}s)" for tier in TIERS]
+        return f"fetch tiers: {', '.join(parts)}, cached={totals['cached']}, failed={totals['failed']}"
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+        if self._scraper is not None:
+            self._scraper.close()
+        if self.cache is not None:
+            await self._cache_call(self.cache.close)
+        self._cache_executor.shutdown(wait=True)
+
+
+fetcher = Fetcher(tiers=tuple(tier.strip() for tier in Config.FETCH_TIERS.split(',') if tier.strip()),
+                  cache=PageCache(Config.PAGE_CACHE_PATH, max_entries=Config.PAGE_CACHE_MAX_ENTRIES))
@@ -1,7 +1,11 @@
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
 from aiogram.utils.keyboard import InlineKeyboardBuilder
+from collections import OrderedDict
 from math import ceil
 
+KB_CACHE_SIZE = 512
+_kb_cache: OrderedDict[tuple, InlineKeyboardMarkup] = OrderedDict()
+
 def back_kb(call_back):
     builder = InlineKeyboardBuilder()
     builder.row(
@@ -41,84 +45,38 @@ def basic_kb():
     return builder.as_markup()
 
 def enum_call_kb(data: dict, page, kb_on_page, call_back_back='base'):
-    show_mode = 0
+    items = [(id, data[id]['message']) for id in list(data.keys())[page * kb_on_page:(page + 1) * kb_on_page]]
+    prefix = data[items[0][0]]['prefix'] if items else ''
+    return catalog_page_kb(items, prefix, page, len(data), kb_on_page, call_back_back)
+
+def catalog_page_kb(items: list[tuple[int, str]], prefix: str, page: int, total: int, kb_on_page: int,
+                    call_back_back='base'):
     builder = InlineKeyboardBuilder()
-    print_data = list(data.keys())[page * kb_on_page:]
-    if len(print_data) > kb_on_page:
-        print_data = print_data[:kb_on_page]
-    else:
-        show_mode = 1
-    if not page: show_mode = -1
-    if len(data) <= kb_on_page: show_mode = 2
-
-    for id in print_data:
-        builder.row(
-            InlineKeyboardButton(
-                text=data[id]['message'],
-                callback_data=f"data_{data[id]['prefix']}_{id}"
-            )
-        )
 
-    if not show_mode:
-        builder.row(
-            InlineKeyboardButton(
-                text='<',
-                callback_data=f"_{data[print_data[0]]['prefix']}_back_{page}"
-            ),
-            InlineKeyboardButton(
-                text=f'{page + 1}/{ceil(len(data) / kb_on_page)}',
-                callback_data='.'
-            ),
-            InlineKeyboardButton(
-                text='>',
-                callback_data=f"_{data[print_data[0]]['prefix']}_forward_{page}"
-            )
-        )
-    elif show_mode == 1:
-        builder.row(
-            InlineKeyboardButton(
-                text='<',
-                callback_data=f"_{data[print_data[0]]['prefix']}_back_{page}"
-            ),
-            InlineKeyboardButton(
-                text=f'{page + 1}/{ceil(len(data) / kb_on_page)}',
-                callback_data='.'
-            ),
-            InlineKeyboardButton(
-                text=f'...',
-                callback_data='.'
-            )
-        )
-    elif show_mode == 2:
+    for id, text in items:
         builder.row(
             InlineKeyboardButton(
-                text='...',
-                callback_data='.'
-            ),
-            InlineKeyboardButton(
-                text=f'{page + 1}/{ceil(len(data) / kb_on_page)}',
-                callback_data='.'
-            ),
-            InlineKeyboardButton(
-                text=f'...',
-                callback_data='.'
+                text=text,
+                callback_data=f"data_{prefix}_{id}"
             )
         )
-    else:
-        builder.row(
-            InlineKeyboardButton(
-                text=f'...',
-                callback_data='.'
-            ),
-            InlineKeyboardButton(
-                text=f'{page + 1}/{ceil(len(data) / kb_on_page)}',
-                callback_data='.'
-            ),
-            InlineKeyboardButton(
-                text='>',
-                callback_data=f"_{data[print_data[0]]['prefix']}_forward_{page}"
-            )
+
+    has_back = bool(items) and page > 0
+    has_forward = bool(items) and (page + 1) * kb_on_page < total
+    builder.row(
+        InlineKeyboardButton(
+            text='<' if has_back else '...',
+            callback_data=f"_{prefix}_back_{page}_{items[0][0]}" if has_back else '.'
+        ),
+        InlineKeyboardButton(
+            text=f'{page + 1}/{ceil(total / kb_on_page)}',
+            callback_data='.'
+        ),
+        InlineKeyboardButton(
+            text='>' if has_forward else '...',
+            callback_data=f"_{prefix}_forward_{page}_{items[-1][0]}" if has_forward else '.'
         )
+    )
 
     builder.row(
         InlineKeyboardButton(
@@ -129,6 +87,18 @@ def enum_call_kb(data: dict, page, kb_on_page, call_back_back='base'):
 
     return builder.as_markup()
 
+def get_cached_kb(key: tuple) -> InlineKeyboardMarkup | None:
+    markup = _kb_cache.get(key)
+    if markup is not None:
+        _kb_cache.move_to_end(key)
+    return markup
+
+def cache_kb(key: tuple, markup: InlineKeyboardMarkup) -> InlineKeyboardMarkup:
+    _kb_cache[key] = markup
+    if len(_kb_cache) > KB_CACHE_SIZE:
+        _kb_cache.popitem(last=False)
+    return markup
+
 def subscribe_kb():
     builder = InlineKeyboardBuilder()
     builder.row(
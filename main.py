@@ -1,127 +1,297 @@
-from bot import bot, dp, db_manager, mailing
+from bot import bot, dp, catalog, db_manager, mailing, outbox_sender, profiler, profiles, sync_subscribers
 from parser import *
+from browser import browser_manager
+from fetcher import fetcher
+from page_cache import content_hash
+from scheduler import Scheduler
+from tracker import LiveTracker
+from metrics import STAGE_SECONDS, registry, start_metrics_server, timed
+from profiler import UPDATE_CYCLE
 import asyncio
-from datetime import datetime, timezone, timedelta
+import functools
+import time
+from datetime import datetime, timezone
 from config import Config
 
-CHECK_INTERVAL = 60 * 60 * 24
-last_update = 0
-base_url = 'https://www.hltv.org'
-events_url = 'https://www.hltv.org/events#tab-ALL'
-teams_url = 'https://www.hltv.org/ranking/teams/'
-matches_url = 'https://www.hltv.org/matches/'
+last_matches_page = None
+scheduler = Scheduler(min_interval=Config.SCHEDULER_MIN_INTERVAL, jitter=Config.SCHEDULER_JITTER)
+live_tracker = LiveTracker(fast=Config.LIVE_POLL_FAST, normal=Config.LIVE_POLL_NORMAL, slow=Config.LIVE_POLL_SLOW,
+                           soon_window=Config.LIVE_POLL_SOON_WINDOW)
+live_page_hash = None
+base_url = Config.HLTV_BASE_URL
+events_url = f'{base_url}/events#tab-ALL'
+teams_url = f'{base_url}/ranking/teams/'
+matches_url = f'{base_url}/matches/'
 
-async def set_stream_links(match_url: str):
-    if db_manager.is_match_notified(match_url):
+@timed(STAGE_SECONDS, stage='stream_links')
+async def set_stream_links(match_urls: list[str], stream_hints: dict[str, dict] | None = None):
+    match_urls = list(dict.fromkeys(match_urls))
+    if not match_urls:
         return
-    match_streams = await get_stream_links(match_url)
-    for stream_name in match_streams.keys():
-        db_manager.add_stream_to_match(match_url=match_url, stream_name=stream_name,
-                                       stream_link=match_streams[stream_name])
+    stream_hints = stream_hints or {}
+    fetch_urls = [url for url in match_urls if url not in stream_hints]
+    semaphore = asyncio.Semaphore(Config.STREAM_FETCH_CONCURRENCY)
 
-async def get_stream_links(match_url: str) -> dict:
-    while 1:
+    async def fetch(match_url: str) -> tuple[dict, str | None]:
+        async with semaphore:
+            return await get_stream_links(match_url)
+
+    started = time.perf_counter()
+    results = dict(zip(fetch_urls, await asyncio.gather(*(fetch(url) for url in fetch_urls))))
+    logger.info(f"fetched streams for {len(fetch_urls)} matches in {time.perf_counter() - started:.1f}s, "
+                f"{len(match_urls) - len(fetch_urls)} taken from the matches page")
+
+    for match_url in match_urls:
+        match_streams, response = results.get(match_url, ({}, None))
+        match_streams = stream_hints.get(match_url) or match_streams
+        stored = True
+        for stream_name in match_streams.keys():
+            stored &= await db_manager.add_stream_to_match(match_url=match_url, stream_name=stream_name,
+                                                           stream_link=match_streams[stream_name])
+        if response and stored:
+            fetcher.mark_applied(match_url, response)
+
+async def get_stream_links(match_url: str) -> tuple[dict, str | None]:
+    for _ in range(Config.STREAM_FETCH_ATTEMPTS):
         try:
-            response = await getting_html_with_playwright(match_url)
+            response, changed = await fetcher.get_page(match_url)
+            if not changed:
+                return {}, None
             urls = get_stream_urls(response)
             if urls:
-                return urls
+                return urls, response
+            await fetcher.forget(match_url)
         except BaseException as err:
+            await fetcher.forget(match_url)
             logger.error(f"Error in get_stream_links {err}")
+    return {}, None
 
-async def update_matches():
-    global CHECK_INTERVAL
-    while 1:
+@timed(STAGE_SECONDS, stage='matches')
+async def update_matches() -> MatchesPage:
+    global last_matches_page
+    for _ in range(Config.PAGE_FETCH_ATTEMPTS):
         try:
-            response = await getting_html_with_playwright(matches_url)
-            matches = get_all_upcoming_matches(response)
-            live_matches = get_live_matches(response)
-            if matches:
+            response, _ = await fetcher.get_page(matches_url)
+            page_hash = content_hash(response or '')
+            changed = not last_matches_page or last_matches_page['hash'] != page_hash
+            if not changed:
+                page = last_matches_page['page']
+                break
+            page = parse_matches_page(response)
+            if page.upcoming:
                 break
+            await fetcher.forget(matches_url)
         except BaseException as err:
+            await fetcher.forget(matches_url)
             logger.error(f"Error in update_matches {err}")
+    else:
+        raise ParserError
 
-    start_times = []
-    matches_url_list = []
-    for match in matches:
-        ongoing = match['start_time'] / 1000 - datetime.now(timezone.utc).timestamp() < timedelta(minutes=3).seconds
-        db_manager.update_match(event_name=match['event'],
-                                start_time=datetime.fromtimestamp(match['start_time'] / 1000, tz=timezone.utc),
-                                ongoing=ongoing,
-                                team_names=[match['team1'], match['team2']], url=base_url+match['url'], format=match['format'])
+    now = datetime.now(timezone.utc).timestamp()
+    ongoing_flags = [match.start_time / 1000 - now < Config.MATCH_NOTIFY_LEAD for match in page.upcoming]
+    ongoing_urls = [base_url + match.url for match, ongoing in zip(page.upcoming, ongoing_flags) if ongoing] + \
+                   [base_url + match.url for match in page.live]
+    stream_hints = {base_url + url: streams for url, streams in page.stream_hints.items()}
 
-        if ongoing:
-            await set_stream_links(base_url + match['url'])
+    if not changed and last_matches_page['ongoing_flags'] == ongoing_flags:
+        logger.info("matches page unchanged, only refreshing streams of ongoing matches")
+        await set_stream_links(ongoing_urls, stream_hints)
+        return page
 
-        matches_url_list.append(base_url+match['url'])
+    records = []
+    for match, ongoing in zip(page.upcoming, ongoing_flags):
+        records.append({'event_name': match.event,
+                        'start_time': datetime.fromtimestamp(match.start_time / 1000, tz=timezone.utc),
+                        'ongoing': ongoing,
+                        'team_names': [match.team1, match.team2], 'url': base_url + match.url, 'format': match.format})
 
-        start_times.append(int(match['start_time'] / 1000))
+    for match in page.live:
+        records.append({'event_name': match.event, 'ongoing': True, 'format': match.format,
+                        'team_names': list(match.teams), 'url': base_url + match.url, 'start_time': None})
 
-    CHECK_INTERVAL = -1
-    for i in range(len(start_times)):
-        CHECK_INTERVAL = min(start_times[i:]) - datetime.now(timezone.utc).timestamp() - timedelta(minutes=3).seconds
-        if CHECK_INTERVAL > 0:
-            break
+    counts = await db_manager.upsert_matches(records)
+    logger.info(f"matches upserted: {counts}")
+    matches_url_list = [record['url'] for record in records]
 
-    for match in live_matches:
-        db_manager.update_match(event_name=match['event'], ongoing=True, format=match['format'],
-                                team_names=[match['team1'], match['team2']], url=base_url+match['url'])
-        await set_stream_links(base_url + match['url'])
-        matches_url_list.append(base_url + match['url'])
+    await set_stream_links(ongoing_urls, stream_hints)
+    await db_manager.delete_matches_not_in_list(matches_url_list)
+    last_matches_page = {'page': page, 'ongoing_flags': ongoing_flags, 'hash': page_hash}
+    return page
 
-    db_manager.delete_matches_not_in_list(matches_url_list)
+@timed(STAGE_SECONDS, stage='live')
+async def poll_live_matches() -> float:
+    global live_page_hash
+    try:
+        response, _ = await fetcher.get_page(matches_url)
+    except Exception as err:
+        logger.error(f"Error in poll_live_matches {err}")
+        response = None
+    page_hash = content_hash(response) if response else None
+    if not response or page_hash == live_page_hash:
+        return live_tracker.next_interval(scheduler.next_run('match:'))
 
+    try:
+        page = parse_matches_page(response, extractors=('live', 'stream_hints'))
+        diff = live_tracker.diff(page)
+        if diff:
+            logger.info(f"live matches: {diff}")
+        if diff.removed:
+            await db_manager.set_matches_finished([base_url + url for url in diff.removed])
+        updated = diff.added + diff.changed
+        if updated:
+            counts = await db_manager.upsert_matches([{'event_name': match.event, 'ongoing': True,
+                                                       'format': match.format, 'team_names': list(match.teams),
+                                                       'url': base_url + match.url, 'start_time': None}
+                                                      for match in updated])
+            logger.info(f"live matches upserted: {counts}")
+            await set_stream_links([base_url + match.url for match in updated],
+                                   {base_url + url: streams for url, streams in page.stream_hints.items()})
+            await mailing()
+    except Exception as err:
+        logger.error(f"Error in poll_live_matches {err}")
+        return live_tracker.fast
+    live_tracker.commit(page)
+    live_page_hash = page_hash
+    return live_tracker.next_interval(scheduler.next_run('match:'))
+
+@timed(STAGE_SECONDS, stage='teams_events')
 async def update_teams_events():
-    while 1:
+    teams, teams_changed, teams_response = [], False, None
+    for _ in range(Config.PAGE_FETCH_ATTEMPTS):
         try:
-            response = await getting_html_with_playwright(teams_url)
+            response, teams_changed = await fetcher.get_page(teams_url)
+            if not teams_changed:
+                teams = []
+                break
             teams = get_teams(response)
             if teams:
+                teams_response = response
                 break
+            await fetcher.forget(teams_url)
         except BaseException as err:
+            await fetcher.forget(teams_url)
             logger.error(f"Error in update_teams {err}")
+    else:
+        logger.error(f"teams page unavailable after {Config.PAGE_FETCH_ATTEMPTS} attempts")
 
-    while 1:
+    events, events_changed, events_response = [], False, None
+    for _ in range(Config.PAGE_FETCH_ATTEMPTS):
         try:
-            response = await getting_html_with_playwright(events_url)
-            events = get_all_events(response)
+            response, events_changed = await fetcher.get_page(events_url)
+            if not events_changed:
+                events = []
+                break
+            events_stats = EventsParseStats()
+            events = get_all_events(response, events_stats)
+            logger.info(f"events page parsed: {events_stats}")
             if events:
+                events_response = response
                 break
+            await fetcher.forget(events_url)
         except BaseException as err:
+            await fetcher.forget(events_url)
             logger.error(f"Error in update_events {err}")
+    else:
+        logger.error(f"events page unavailable after {Config.PAGE_FETCH_ATTEMPTS} attempts")
 
-    for team in teams:
-        db_manager.create_team(team)
+    if not teams_changed and not events_changed:
+        logger.info("teams and events pages unchanged, only purging finished events")
 
-    for event in events:
-        db_manager.update_event(name=event['name'],
-                                start_date=datetime.fromtimestamp(event['start_date'] / 1000, tz=timezone.utc),
-                                end_date=datetime.fromtimestamp(event['end_date'] / 1000, tz=timezone.utc))
+    if teams:
+        counts = await db_manager.sync_teams(teams)
+        logger.info(f"teams synced: {counts}")
+        if counts['created']:
+            catalog.invalidate('teams')
+        fetcher.mark_applied(teams_url, teams_response)
 
-    db_manager.delete_ended_events()
+    event_records = [{'name': event['name'],
+                      'start_date': datetime.fromtimestamp(event['start_date'] / 1000, tz=timezone.utc),
+                      'end_date': datetime.fromtimestamp(event['end_date'] / 1000, tz=timezone.utc)}
+                     for event in events]
+    counts = await db_manager.sync_events(event_records)
+    logger.info(f"events synced: {counts}")
+    if counts['created'] or counts['changed'] or counts['deleted']:
+        catalog.invalidate('events')
+    if events_response:
+        fetcher.mark_applied(events_url, events_response)
+    logger.info(str(catalog))
 
+async def start_match(match_url: str):
+    logger.info(f"match {match_url} is starting")
+    await db_manager.set_match_ongoing(match_url)
+    await set_stream_links([match_url])
+    await mailing()
+
+def schedule_match_starts(page: MatchesPage):
+    now = datetime.now(timezone.utc).timestamp()
+    keys = set()
+    for match in page.upcoming:
+        notify_at = match.start_time / 1000 - Config.MATCH_NOTIFY_LEAD
+        if notify_at <= now:
+            continue
+        key = f"match:{match.url}"
+        keys.add(key)
+        scheduler.schedule(key, notify_at, functools.partial(start_match, base_url + match.url))
+    for key in scheduler.pending('match:'):
+        if key not in keys:
+            scheduler.cancel(key)
+    logger.info(f"{len(keys)} match starts scheduled")
+
+@timed(STAGE_SECONDS, stage='update_cycle')
 async def update_data():
     logger.info('start update')
-    global last_update
-    if datetime.now(timezone.utc).timestamp() - last_update >= 60 * 60 * 24:
-        await update_teams_events()
-        last_update = datetime.now(timezone.utc).timestamp()
-    await update_matches()
-    await mailing()
+    started = time.perf_counter()
+    async with profiler.run(UPDATE_CYCLE):
+        page = await update_matches()
+        schedule_match_starts(page)
+        with STAGE_SECONDS.time(stage='mailing'):
+            await mailing()
+    logger.info(f"update cycle finished in {time.perf_counter() - started:.1f}s")
+    logger.info(fetcher.summary())
+    logger.info(str(profiles))
 
-async def schedule_event_checker():
-    while True:
-        try:
-            await update_data()
-        except Exception as err:
-            logger.error(f"Error in schedule_event_checker {err}")
-        await asyncio.sleep(CHECK_INTERVAL)
+async def log_metrics():
+    logger.info(registry.summary())
+
+async def schedule_updates():
+    try:
+        await update_teams_events()
+    except Exception as err:
+        logger.error(f"Error in schedule_updates {err}")
+    scheduler.every('teams_events', Config.CATALOG_REFRESH_INTERVAL, update_teams_events,
+                    delay=Config.CATALOG_REFRESH_INTERVAL)
+    scheduler.every('matches', Config.MATCHES_REFRESH_INTERVAL, update_data)
+    scheduler.every('subscribers', Config.SUBSCRIBER_CHECK_INTERVAL, sync_subscribers,
+                    delay=Config.SUBSCRIBER_CHECK_INTERVAL)
+    scheduler.every('live', Config.LIVE_POLL_SLOW, poll_live_matches, delay=Config.LIVE_POLL_FAST)
+    scheduler.every('metrics', Config.METRICS_LOG_INTERVAL, log_metrics, delay=Config.METRICS_LOG_INTERVAL)
+    await scheduler.run()
 
 async def main():
-    db_manager.create_user(Config.ADMIN_ID)
-    db_manager.set_admin(Config.ADMIN_ID)
-    asyncio.create_task(schedule_event_checker())
-    await dp.start_polling(bot)
+    if Config.ADMIN_ID:
+        await db_manager.create_user(Config.ADMIN_ID)
+        await profiles.set_admin(Config.ADMIN_ID)
+    if Config.PROFILE_NEXT_CYCLE:
+        profiler.arm(UPDATE_CYCLE)
+    if Config.PROFILE_HANDLER:
+        profiler.arm(Config.PROFILE_HANDLER)
+    await sync_subscribers()
+    metrics_runner = None
+    if Config.METRICS_PORT:
+        metrics_runner = await start_metrics_server(Config.METRICS_HOST, Config.METRICS_PORT,
+                                                    json_routes={'/fetch_stats': fetcher.stats})
+        logger.info(f"metrics served on http://{Config.METRICS_HOST}:{Config.METRICS_PORT}/metrics, "
+                    f"per-URL fetch tiers on /fetch_stats")
+    asyncio.create_task(schedule_updates())
+    asyncio.create_task(outbox_sender())
+    try:
+        await dp.start_polling(bot)
+    finally:
+        await fetcher.close()
+        await browser_manager.close()
+        db_manager.close()
+        if metrics_runner:
+            await metrics_runner.cleanup()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
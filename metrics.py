@@ -0,0 +1,233 @@
+import asyncio
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable
+from urllib.parse import urlsplit
+from aiohttp import web
+
+_observers = []
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ''
+    pairs = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return '{' + pairs + '}'
+
+
+class Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, '') for name in self.labelnames)
+
+    def _snapshot(self) -> list[tuple[tuple, object]]:
+        with self._lock:
+            items = list(self._values.items())
+        return sorted(items)
+
+    def header(self) -> list[str]:
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def render(self) -> list[str]:
+        return self.header() + [f'{self.name}{_labels(self.labelnames, key)} {value}'
+                                for key, value in self._snapshot()]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            data = self._values.get(key)
+            if data is None:
+                data = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            data[0][bisect_left(self.buckets, value)] += 1
+            data[1] += value
+            data[2] += 1
+        for observer in _observers:
+            observer(self.name, dict(zip(self.labelnames, key)), value)
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _snapshot(self) -> list[tuple[tuple, tuple[list[int], float, int]]]:
+        with self._lock:
+            items = [(key, (list(counts), total, count)) for key, (counts, total, count) in self._values.items()]
+        return sorted(items)
+
+    def totals(self) -> dict[tuple, tuple[int, float]]:
+        return {key: (count, total) for key, (_, total, count) in self._snapshot()}
+
+    def render(self) -> list[str]:
+        lines = self.header()
+        for key, (counts, total, count) in self._snapshot():
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{self.name}_bucket{_labels(self.labelnames + ("le",), key + (le,))} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.labelnames, key)} {total}')
+            lines.append(f'{self.name}_count{_labels(self.labelnames, key)} {count}')
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def _get(self, cls, name: str, documentation: str, labelnames: tuple[str, ...], **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._get(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._get(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), **kwargs) -> Histogram:
+        return self._get(Histogram, name, documentation, labelnames, **kwargs)
+
+    def render(self) -> str:
+        return '\n'.join(line for metric in self._metrics.values() for line in metric.render()) + '\n'
+
+    def summary(self, limit: int = 10) -> str:
+        timings = []
+        for metric in self._metrics.values():
+            if isinstance(metric, Histogram):
+                for key, (count, total) in metric.totals().items():
+                    timings.append((total, count, f'{metric.name}{_labels(metric.labelnames, key)}'))
+        timings.sort(reverse=True)
+        parts = [f'{name} n={count} total={total:.2f}s avg={total / count * 1000:.1f}ms'
+                 for total, count, name in timings[:limit]]
+        return 'metrics: ' + ('; '.join(parts) if parts else 'no samples yet')
+
+
+registry = Registry()
+
+
+def add_observer(callback):
+    global _observers
+    _observers = _observers + [callback]
+
+
+def remove_observer(callback):
+    global _observers
+    _observers = [observer for observer in _observers if observer is not callback]
+
+
+FETCH_SECONDS = registry.histogram('hltv_fetch_seconds', 'Page fetch latency by tier and page', ('tier', 'page'))
+FETCH_TOTAL = registry.counter('hltv_fetch_total', 'Page fetch attempts by tier, page and result',
+                               ('tier', 'page', 'result'))
+FETCH_BYTES = registry.counter('hltv_fetch_bytes_total', 'Bytes of HTML received by tier and page', ('tier', 'page'))
+PARSER_SECONDS = registry.histogram('parser_seconds', 'Time spent in each HTML parser', ('parser',))
+DB_SECONDS = registry.histogram('db_seconds', 'DatabaseManager method latency', ('method',))
+DB_ERRORS = registry.counter('db_errors_total', 'DatabaseManager methods that raised', ('method',))
+STAGE_SECONDS = registry.histogram('update_stage_seconds', 'Time spent in each update stage', ('stage',))
+NOTIFICATIONS_QUEUED = registry.counter('notifications_queued_total', 'Notifications written to the outbox')
+MESSAGES_TOTAL = registry.counter('telegram_messages_total', 'Notification messages by result', ('result',))
+SEND_SECONDS = registry.histogram('telegram_send_seconds', 'Latency of successful notification sends')
+OUTBOX_PENDING_GAUGE = registry.gauge('outbox_pending', 'Notifications waiting in the outbox')
+OUTBOX_LAG_GAUGE = registry.gauge('outbox_lag_seconds', 'Age of the oldest notification waiting in the outbox')
+HANDLER_SECONDS = registry.histogram('handler_seconds', 'aiogram handler latency', ('handler',))
+HANDLER_ERRORS = registry.counter('handler_errors_total', 'aiogram handlers that raised', ('handler',))
+
+
+def page_kind(url: str) -> str:
+    path = urlsplit(url).path.rstrip('/')
+    if path.startswith('/matches/'):
+        return 'match'
+    if path in ('/matches', '/events', '/ranking/teams'):
+        return path.rsplit('/', 1)[-1]
+    return 'other'
+
+
+def timed(histogram: Histogram, **labels):
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with histogram.time(**labels):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with histogram.time(**labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+async def metrics_handler(request: web.Request) -> web.Response:
+    return web.Response(text=registry.render(), content_type='text/plain', charset='utf-8',
+                        headers={'X-Content-Type-Options': 'nosniff'})
+
+
+def json_handler(source: Callable[[], object]):
+    async def handler(request: web.Request) -> web.Response:
+        return web.json_response(source())
+    return handler
+
+
+async def start_metrics_server(host: str, port: int,
+                               json_routes: dict[str, Callable[[], object]] | None = None) -> web.AppRunner:
+    app = web.Application()
+    app.router.add_get('/metrics', metrics_handler)
+    for path, source in (json_routes or {}).items():
+        app.router.add_get(path, json_handler(source))
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
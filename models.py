@@ -1,14 +1,35 @@
+import asyncio
+import functools
+import sqlite3
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey, Table, Boolean
+from typing import Iterable
+from sqlalchemy import create_engine, func, insert, literal, select, true, union, update, Column, Integer, String, \
+    DateTime, ForeignKey, Table, Boolean, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.event import listen
+from sqlalchemy.schema import CreateTable
 from sqlalchemy.orm import declarative_base, relationship, sessionmaker, Session, joinedload
+from config import Config
+from logger import logger
+from metrics import DB_ERRORS, DB_SECONDS
 
 Base = declarative_base()
 
+OUTBOX_PENDING = 'pending'
+OUTBOX_SENT = 'sent'
+OUTBOX_FAILED = 'failed'
+
 match_team_association = Table(
     'match_team',
     Base.metadata,
     Column('match_id', Integer, ForeignKey('match.id', ondelete="CASCADE"), primary_key=True),
-    Column('team_id', Integer, ForeignKey('team.id', ondelete="CASCADE"), primary_key=True)
+    Column('team_id', Integer, ForeignKey('team.id', ondelete="CASCADE"), primary_key=True),
+    Index('ix_match_team_team_id', 'team_id')
 )
 
 class User(Base):
@@ -74,6 +95,9 @@ class Team(Base):
 
 class Match(Base):
     __tablename__ = 'match'
+    __table_args__ = (
+        Index('ix_match_ongoing_notified', 'ongoing', 'notified'),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     start_time = Column(DateTime, nullable=True)
@@ -81,7 +105,7 @@ class Match(Base):
     format = Column(String)
     ongoing = Column(Boolean)
     notified = Column(Boolean)
-    event_id = Column(Integer, ForeignKey('event.id'), nullable=False)
+    event_id = Column(Integer, ForeignKey('event.id', ondelete="CASCADE"), nullable=False, index=True)
 
     event = relationship("Event", back_populates="matches")
     teams = relationship("Team", secondary=match_team_association, back_populates="matches")
@@ -97,7 +121,7 @@ class Stream(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     link = Column(String, nullable=False, unique=True)
     name = Column(String, nullable=False)
-    match_id = Column(Integer, ForeignKey('match.id', ondelete="CASCADE"), nullable=False)
+    match_id = Column(Integer, ForeignKey('match.id', ondelete="CASCADE"), nullable=False, index=True)
 
     match = relationship("Match", back_populates="streams")
 
@@ -108,21 +132,133 @@ class UserEventSubscription(Base):
     __tablename__ = 'user_event_subscription'
 
     user_id = Column(Integer, ForeignKey('user.id', ondelete="CASCADE"), primary_key=True)
-    event_id = Column(Integer, ForeignKey('event.id', ondelete="CASCADE"), primary_key=True)
+    event_id = Column(Integer, ForeignKey('event.id', ondelete="CASCADE"), primary_key=True, index=True)
 
 
 class UserTeamSubscription(Base):
     __tablename__ = 'user_team_subscription'
 
     user_id = Column(Integer, ForeignKey('user.id', ondelete="CASCADE"), primary_key=True)
-    team_id = Column(Integer, ForeignKey('team.id', ondelete="CASCADE"), primary_key=True)
+    team_id = Column(Integer, ForeignKey('team.id', ondelete="CASCADE"), primary_key=True, index=True)
+
+
+class NotificationOutbox(Base):
+    __tablename__ = 'notification_outbox'
+    __table_args__ = (
+        UniqueConstraint('match_id', 'user_id'),
+        Index('ix_notification_outbox_status_id', 'status', 'id'),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    match_id = Column(Integer, ForeignKey('match.id', ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey('user.id', ondelete="CASCADE"), nullable=False)
+    status = Column(String, nullable=False, default=OUTBOX_PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False)
+    sent_at = Column(DateTime)
+    last_error = Column(String)
+
+
+def _naive_utc(value: datetime | None) -> datetime | None:
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _set_sqlite_pragmas(pragmas: dict):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+    return on_connect
+
+
+def _rebuild_sqlite_table(connection, table: Table):
+    temp_name = f"{table.name}_rebuild"
+    ddl = str(CreateTable(table).compile(connection)).replace(
+        connection.dialect.identifier_preparer.format_table(table), temp_name, 1
+    )
+    columns = ', '.join(connection.dialect.identifier_preparer.quote(column.name) for column in table.columns)
+    table_name = connection.dialect.identifier_preparer.format_table(table)
+    connection.exec_driver_sql(ddl)
+    connection.exec_driver_sql(f"INSERT INTO {temp_name} ({columns}) SELECT {columns} FROM {table_name}")
+    connection.exec_driver_sql(f"DROP TABLE {table_name}")
+    connection.exec_driver_sql(f"ALTER TABLE {temp_name} RENAME TO {table_name}")
+
+
+def _copy_sqlite(connection, path: str) -> str:
+    backup = sqlite3.connect(path)
+    try:
+        connection.connection.driver_connection.backup(backup)
+    finally:
+        backup.close()
+    return path
+
+
+def _backup_sqlite(connection, engine: Engine) -> str | None:
+    database = engine.url.database
+    if not database or database == ':memory:':
+        return None
+    return _copy_sqlite(connection, f"{database}.{datetime.now().strftime('%Y%m%d-%H%M%S')}.bak")
+
+
+def migrate(engine: Engine):
+    if engine.dialect.name == 'sqlite':
+        references = (
+            (Match.__table__, 'event_id', 'event'),
+            (match_team_association, 'match_id', 'match'),
+            (match_team_association, 'team_id', 'team'),
+            (Stream.__table__, 'match_id', 'match'),
+            (UserEventSubscription.__table__, 'event_id', 'event'),
+            (UserEventSubscription.__table__, 'user_id', 'user'),
+            (UserTeamSubscription.__table__, 'team_id', 'team'),
+            (UserTeamSubscription.__table__, 'user_id', 'user'),
+            (NotificationOutbox.__table__, 'match_id', 'match'),
+            (NotificationOutbox.__table__, 'user_id', 'user'),
+        )
+        orphans = ' UNION ALL '.join(
+            f'SELECT 1 FROM "{table.name}" WHERE {column} NOT IN (SELECT id FROM "{parent}")'
+            for table, column, parent in references
+        )
+        with engine.connect() as connection:
+            connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+            connection.commit()
+            foreign_keys = connection.exec_driver_sql('PRAGMA foreign_key_list("match")').all()
+            rebuild = any(row[2] == 'event' and row[6] != 'CASCADE' for row in foreign_keys)
+            has_orphans = connection.exec_driver_sql(f"SELECT EXISTS ({orphans})").scalar()
+            if rebuild or has_orphans:
+                logger.warning(f"migrating {engine.url.database}: backup saved to {_backup_sqlite(connection, engine)}")
+            if rebuild:
+                _rebuild_sqlite_table(connection, Match.__table__)
+                logger.warning("match table rebuilt with ON DELETE CASCADE on event_id")
+            for table, column, parent in references:
+                deleted = connection.exec_driver_sql(
+                    f'DELETE FROM "{table.name}" WHERE {column} NOT IN (SELECT id FROM "{parent}")'
+                ).rowcount
+                if deleted:
+                    logger.warning(f"removed {deleted} {table.name} rows pointing to missing {parent} rows")
+            connection.commit()
+            connection.exec_driver_sql("PRAGMA foreign_keys=ON")
+            connection.commit()
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
 
 
 class DatabaseManager:
-    def __init__(self, db_url: str = "sqlite:///events.db"):
-        self.engine = create_engine(db_url)
+    def __init__(self, db_url: str = "sqlite:///events.db", sqlite_pragmas: dict | None = None,
+                 pool_size: int | None = None):
+        engine_options = {}
+        if pool_size and make_url(db_url).database not in (None, '', ':memory:'):
+            engine_options.update(pool_size=pool_size, max_overflow=pool_size)
+        self.engine = create_engine(db_url, **engine_options)
+        if self.engine.dialect.name == 'sqlite':
+            pragmas = Config.SQLITE_PRAGMAS if sqlite_pragmas is None else sqlite_pragmas
+            listen(self.engine, 'connect', _set_sqlite_pragmas(pragmas))
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
         Base.metadata.create_all(bind=self.engine)
+        migrate(self.engine)
 
     def get_db(self) -> Session:
         db = self.SessionLocal()
@@ -131,6 +267,10 @@ class DatabaseManager:
         finally:
             db.close()
 
+    def export_sqlite(self, path: str) -> str:
+        with self.engine.connect() as connection:
+            return _copy_sqlite(connection, path)
+
     def create_user(self, user_id: int) -> User:
         with self.SessionLocal() as db:
             user = db.query(User).filter(User.id == user_id).first()
@@ -166,6 +306,33 @@ class DatabaseManager:
                 db.refresh(event)
             return event
 
+    def sync_events(self, records: list[dict]) -> dict[str, int]:
+        records = {record['name']: record for record in records}
+        with self.SessionLocal() as db:
+            existing = {row.name: row for row in db.execute(
+                select(Event.id, Event.name, Event.start_date, Event.end_date).where(Event.name.in_(records))
+            )}
+            new_rows = []
+            changed_rows = []
+            for name, record in records.items():
+                old = existing.get(name)
+                if old is None:
+                    new_rows.append({'name': name, 'start_date': record.get('start_date'),
+                                     'end_date': record.get('end_date')})
+                elif (_naive_utc(old.start_date), _naive_utc(old.end_date)) != \
+                        (_naive_utc(record.get('start_date')), _naive_utc(record.get('end_date'))):
+                    changed_rows.append({'id': old.id, 'start_date': record.get('start_date'),
+                                         'end_date': record.get('end_date')})
+            if new_rows:
+                db.execute(insert(Event), new_rows)
+            if changed_rows:
+                db.execute(update(Event), changed_rows)
+            current_time = datetime.now(timezone.utc) - timedelta(days=1)
+            deleted_count = db.query(Event).filter(Event.end_date < current_time).delete()
+            db.commit()
+        return {'created': len(new_rows), 'changed': len(changed_rows),
+                'unchanged': len(records) - len(new_rows) - len(changed_rows), 'deleted': deleted_count}
+
     def get_event_by_id(self, id: int) -> Event:
         with self.SessionLocal() as db:
             return db.query(Event).filter(Event.id == id).first()
@@ -184,6 +351,16 @@ class DatabaseManager:
                 db.refresh(team)
             return team
 
+    def sync_teams(self, names: list[str]) -> dict[str, int]:
+        names = list(dict.fromkeys(names))
+        with self.SessionLocal() as db:
+            existing = set(db.execute(select(Team.name).where(Team.name.in_(names))).scalars())
+            new_rows = [{'name': name} for name in names if name not in existing]
+            if new_rows:
+                db.execute(insert(Team), new_rows)
+                db.commit()
+        return {'created': len(new_rows), 'unchanged': len(existing)}
+
     def get_team_by_id(self, id: int) -> Team:
         with self.SessionLocal() as db:
             return db.query(Team).filter(Team.id == id).first()
@@ -230,31 +407,108 @@ class DatabaseManager:
             db.refresh(match)
             return match
 
-    def get_matches_for_user(self, user_id: int) -> dict:
-        with self.SessionLocal() as db:
-            user = db.query(User).filter(User.id == user_id).first()
-            if not user:
-                return []
+    def _insert(self, table):
+        if self.engine.dialect.name == 'postgresql':
+            return postgresql_insert(table)
+        if self.engine.dialect.name == 'sqlite':
+            return sqlite_insert(table)
+        return None
+
+    def upsert_matches(self, records: list[dict]) -> dict[str, int]:
+        counts = {'created': 0, 'changed': 0, 'unchanged': 0, 'skipped': 0}
+        records = list({record['url']: record for record in records}.values())
+        if not records:
+            return counts
+
+        if self._insert(Match) is None:
+            for record in records:
+                match = self.update_match(**record)
+                counts['changed' if match else 'skipped'] += 1
+            return counts
+
+        with self.SessionLocal() as db:
+            event_names = {record['event_name'] for record in records}
+            team_names = {name for record in records for name in record['team_names'] or []}
+            event_ids = dict(db.execute(select(Event.name, Event.id).where(Event.name.in_(event_names))).all())
+            team_ids = dict(db.execute(select(Team.name, Team.id).where(Team.name.in_(team_names))).all())
+
+            existing = {row.url: row for row in db.execute(
+                select(Match.id, Match.url, Match.event_id, Match.format, Match.ongoing, Match.start_time)
+                .where(Match.url.in_([record['url'] for record in records]))
+            )}
+            existing_teams = defaultdict(set)
+            for match_id, team_id in db.execute(
+                select(match_team_association.c.match_id, match_team_association.c.team_id)
+                .where(match_team_association.c.match_id.in_([row.id for row in existing.values()]))
+            ):
+                existing_teams[match_id].add(team_id)
+
+            rows = []
+            wanted_teams = {}
+            for record in records:
+                old = existing.get(record['url'])
+                event_id = old.event_id if old else event_ids.get(record['event_name'])
+                if event_id is None:
+                    counts['skipped'] += 1
+                    continue
+                teams = {team_ids[name] for name in record['team_names'] or [] if name in team_ids}
+                start_time = record.get('start_time')
+                if old and (old.format, old.ongoing, _naive_utc(old.start_time), existing_teams[old.id]) == \
+                        (record['format'], record['ongoing'], _naive_utc(start_time), teams):
+                    counts['unchanged'] += 1
+                    continue
+                counts['changed' if old else 'created'] += 1
+                rows.append({'url': record['url'], 'event_id': event_id, 'format': record['format'],
+                             'ongoing': record['ongoing'], 'start_time': start_time, 'notified': False})
+                wanted_teams[record['url']] = teams
+
+            if rows:
+                stmt = self._insert(Match).values(rows)
+                db.execute(stmt.on_conflict_do_update(
+                    index_elements=[Match.url],
+                    set_={
+                        'format': stmt.excluded.format,
+                        'ongoing': stmt.excluded.ongoing,
+                        'start_time': stmt.excluded.start_time,
+                    }
+                ))
+                match_ids = dict(db.execute(select(Match.url, Match.id).where(Match.url.in_(wanted_teams))).all())
+                db.execute(match_team_association.delete().where(
+                    match_team_association.c.match_id.in_(match_ids.values())
+                ))
+                team_rows = [{'match_id': match_ids[url], 'team_id': team_id}
+                             for url, teams in wanted_teams.items() for team_id in teams]
+                if team_rows:
+                    db.execute(match_team_association.insert(), team_rows)
+                db.commit()
 
-            event_matches = db.query(Match).options(
-                joinedload(Match.event),
-                joinedload(Match.teams)
-            ).join(Event).join(
-                UserEventSubscription,
-                UserEventSubscription.event_id == Event.id
-            ).filter(UserEventSubscription.user_id == user_id).all()
-
-            team_matches = db.query(Match).options(
-                joinedload(Match.event),
-                joinedload(Match.teams)
-            ).join(match_team_association).join(
-                Team
-            ).join(
-                UserTeamSubscription,
-                UserTeamSubscription.team_id == Team.id
-            ).filter(UserTeamSubscription.user_id == user_id).all()
-
-            return event_matches + team_matches
+        return counts
+
+    def get_matches_for_user(self, user_id: int, limit: int = 50) -> list[tuple[datetime | None, str, list[str]]]:
+        by_event = select(UserEventSubscription.user_id).where(
+            UserEventSubscription.user_id == user_id,
+            UserEventSubscription.event_id == Match.event_id
+        ).exists()
+        by_team = select(UserTeamSubscription.user_id).join(
+            match_team_association, match_team_association.c.team_id == UserTeamSubscription.team_id
+        ).where(
+            UserTeamSubscription.user_id == user_id,
+            match_team_association.c.match_id == Match.id
+        ).exists()
+        query = select(Match.id, Match.start_time, Event.name).join(Event, Event.id == Match.event_id) \
+            .where(by_event | by_team) \
+            .order_by(Match.start_time.asc().nulls_first(), Match.id) \
+            .limit(limit)
+        with self.SessionLocal() as db:
+            matches = db.execute(query).all()
+            team_names = defaultdict(list)
+            for match_id, name in db.execute(
+                select(match_team_association.c.match_id, Team.name)
+                .join(Team, Team.id == match_team_association.c.team_id)
+                .where(match_team_association.c.match_id.in_([match.id for match in matches]))
+            ):
+                team_names[match_id].append(name)
+            return [(match.start_time, match.name, team_names[match.id]) for match in matches]
 
     def subscribe_user_to_event(self, user_id: int, event_id: int) -> str:
         with self.SessionLocal() as db:
@@ -319,6 +573,16 @@ class DatabaseManager:
         with self.SessionLocal() as db:
             return db.query(Team).all()
 
+    def get_event_rows(self) -> list[tuple[int, str, datetime | None, datetime | None]]:
+        with self.SessionLocal() as db:
+            return [tuple(row) for row in db.execute(
+                select(Event.id, Event.name, Event.start_date, Event.end_date).order_by(Event.id)
+            )]
+
+    def get_team_rows(self) -> list[tuple[int, str]]:
+        with self.SessionLocal() as db:
+            return [tuple(row) for row in db.execute(select(Team.id, Team.name).order_by(Team.id))]
+
     def get_user_subscribed_events(self, user_id: int) -> list[Event]:
         with self.SessionLocal() as db:
             user = db.query(User).filter(User.id == user_id).first()
@@ -374,6 +638,21 @@ class DatabaseManager:
 
             return users
 
+    def _pending_notification(self):
+        return (Match.ongoing == True) & ((Match.notified == False) | Match.notified.is_(None))
+
+    def _match_recipients_query(self, match_ids: list[int] | None = None):
+        pending = self._pending_notification() if match_ids is None else Match.id.in_(match_ids)
+        by_event = select(Match.id.label('match_id'), UserEventSubscription.user_id.label('user_id')) \
+            .join(UserEventSubscription, UserEventSubscription.event_id == Match.event_id) \
+            .where(pending)
+        by_team = select(match_team_association.c.match_id, UserTeamSubscription.user_id) \
+            .join(Match, Match.id == match_team_association.c.match_id) \
+            .join(UserTeamSubscription, UserTeamSubscription.team_id == match_team_association.c.team_id) \
+            .where(pending)
+        recipients = union(by_event, by_team).subquery()
+        return select(recipients.c.match_id, recipients.c.user_id).order_by(recipients.c.match_id, recipients.c.user_id)
+
     def get_ongoing_matches(self):
         with self.SessionLocal() as db:
             return db.query(Match).options(
@@ -381,21 +660,19 @@ class DatabaseManager:
                 joinedload(Match.event)
             ).filter(Match.ongoing == True).all()
 
-    def add_stream_to_match(self, match_url: str, stream_link: str, stream_name: str) -> Stream:
+    def add_stream_to_match(self, match_url: str, stream_link: str, stream_name: str) -> bool:
         with self.SessionLocal() as db:
             match = db.query(Match).filter(Match.url == match_url, Match.ongoing == True).first()
             if not match:
-                return None
+                return False
 
             existing_stream = db.query(Stream).filter(Stream.link == stream_link).first()
             if existing_stream:
-                return None
+                return True
 
-            stream = Stream(link=stream_link, match_id=match.id, name=stream_name)
-            db.add(stream)
+            db.add(Stream(link=stream_link, match_id=match.id, name=stream_name))
             db.commit()
-            db.refresh(stream)
-            return stream
+            return True
 
     def get_streams_for_match(self, match_url: str) -> list[Stream]:
         with self.SessionLocal() as db:
@@ -404,6 +681,143 @@ class DatabaseManager:
                 return []
             return match.streams
 
+    def get_match_by_id(self, match_id: int) -> Match:
+        with self.SessionLocal() as db:
+            return db.query(Match).options(
+                joinedload(Match.teams),
+                joinedload(Match.event)
+            ).filter(Match.id == match_id).first()
+
+    def _outbox_insert(self):
+        stmt = self._insert(NotificationOutbox)
+        if stmt is None:
+            return insert(NotificationOutbox)
+        return stmt.on_conflict_do_nothing(index_elements=['match_id', 'user_id'])
+
+    def enqueue_notifications(self) -> int:
+        with self.SessionLocal() as db:
+            match_ids = list(db.execute(select(Match.id).where(self._pending_notification())).scalars())
+            if not match_ids:
+                return 0
+            recipients = self._match_recipients_query(match_ids).subquery()
+            result = db.execute(self._outbox_insert().from_select(
+                ['match_id', 'user_id', 'status', 'attempts', 'created_at'],
+                select(recipients.c.match_id, recipients.c.user_id, literal(OUTBOX_PENDING), literal(0),
+                       literal(_naive_utc(datetime.now(timezone.utc)), DateTime)).where(true())
+            ))
+            db.execute(update(Match).where(Match.id.in_(match_ids), self._pending_notification()).values(notified=True))
+            db.commit()
+            return result.rowcount
+
+    def get_subscription_pairs(self) -> tuple[list[tuple[int, int]], list[tuple[int, int]]]:
+        with self.SessionLocal() as db:
+            event_pairs = db.execute(
+                select(UserEventSubscription.event_id, UserEventSubscription.user_id)
+                .order_by(UserEventSubscription.event_id, UserEventSubscription.user_id)
+            ).tuples().all()
+            team_pairs = db.execute(
+                select(UserTeamSubscription.team_id, UserTeamSubscription.user_id)
+                .order_by(UserTeamSubscription.team_id, UserTeamSubscription.user_id)
+            ).tuples().all()
+            return event_pairs, team_pairs
+
+    def get_pending_matches(self) -> list[tuple[int, int, list[int]]]:
+        with self.SessionLocal() as db:
+            matches = db.execute(select(Match.id, Match.event_id).where(self._pending_notification())).all()
+            team_ids = defaultdict(list)
+            for match_id, team_id in db.execute(
+                select(match_team_association.c.match_id, match_team_association.c.team_id)
+                .where(match_team_association.c.match_id.in_([match.id for match in matches]))
+            ):
+                team_ids[match_id].append(team_id)
+            return [(match.id, match.event_id, team_ids[match.id]) for match in matches]
+
+    def enqueue_recipients(self, recipients: dict[int, Iterable[int]]) -> int:
+        if not recipients:
+            return 0
+        created_at = _naive_utc(datetime.now(timezone.utc))
+        with self.SessionLocal() as db:
+            pending = list(db.execute(
+                select(Match.id).where(Match.id.in_(list(recipients)), self._pending_notification())
+            ).scalars())
+            rows = [{'match_id': match_id, 'user_id': user_id, 'status': OUTBOX_PENDING, 'attempts': 0,
+                     'created_at': created_at}
+                    for match_id in pending for user_id in sorted(recipients[match_id])]
+            if rows:
+                db.execute(self._outbox_insert(), rows)
+            db.execute(update(Match).where(Match.id.in_(pending)).values(notified=True))
+            db.commit()
+        return len(rows)
+
+    def get_outbox_batch(self, limit: int) -> list[tuple[int, int, int]]:
+        with self.SessionLocal() as db:
+            return [tuple(row) for row in db.execute(
+                select(NotificationOutbox.id, NotificationOutbox.match_id, NotificationOutbox.user_id)
+                .where(NotificationOutbox.status == OUTBOX_PENDING)
+                .order_by(NotificationOutbox.id)
+                .limit(limit)
+            )]
+
+    def mark_outbox_sent(self, row_ids: list[int]):
+        if not row_ids:
+            return
+        with self.SessionLocal() as db:
+            db.execute(update(NotificationOutbox).where(NotificationOutbox.id.in_(row_ids)).values(
+                status=OUTBOX_SENT, sent_at=_naive_utc(datetime.now(timezone.utc)), attempts=NotificationOutbox.attempts + 1
+            ))
+            db.commit()
+
+    def mark_outbox_failed(self, failures: list[tuple[int, str, bool]], max_attempts: int):
+        if not failures:
+            return
+        with self.SessionLocal() as db:
+            rows = {row.id: row for row in db.query(NotificationOutbox).filter(
+                NotificationOutbox.id.in_([row_id for row_id, _, _ in failures])
+            )}
+            for row_id, error, permanent in failures:
+                row = rows.get(row_id)
+                if not row:
+                    continue
+                row.attempts += 1
+                row.last_error = error
+                if permanent or row.attempts >= max_attempts:
+                    row.status = OUTBOX_FAILED
+            db.commit()
+
+    def get_outbox_lag(self) -> tuple[int, float]:
+        with self.SessionLocal() as db:
+            pending, oldest = db.execute(
+                select(func.count(NotificationOutbox.id), func.min(NotificationOutbox.created_at))
+                .where(NotificationOutbox.status == OUTBOX_PENDING)
+            ).one()
+            if not oldest:
+                return 0, 0.0
+            return pending, max(0.0, (_naive_utc(datetime.now(timezone.utc)) - _naive_utc(oldest)).total_seconds())
+
+    def purge_outbox(self, older_than: timedelta) -> int:
+        with self.SessionLocal() as db:
+            deleted_count = db.query(NotificationOutbox).filter(
+                NotificationOutbox.status != OUTBOX_PENDING,
+                NotificationOutbox.created_at < _naive_utc(datetime.now(timezone.utc) - older_than)
+            ).delete()
+            db.commit()
+            return deleted_count
+
+    def set_match_ongoing(self, match_url: str):
+        with self.SessionLocal() as db:
+            db.query(Match).filter(Match.url == match_url).update({Match.ongoing: True})
+            db.commit()
+
+    def set_matches_finished(self, match_urls: list[str]) -> int:
+        if not match_urls:
+            return 0
+        with self.SessionLocal() as db:
+            updated = db.execute(
+                update(Match).where(Match.url.in_(match_urls), Match.ongoing.is_(True)).values(ongoing=False)
+            ).rowcount
+            db.commit()
+            return updated
+
     def set_notifed_match(self, match_url: str):
         with self.SessionLocal() as db:
             match = db.query(Match).filter(Match.url == match_url).first()
@@ -414,17 +828,17 @@ class DatabaseManager:
     def is_match_notified(self, match_url: str):
         with self.SessionLocal() as db:
             match = db.query(Match).filter(Match.url == match_url).first()
-            return match.notified
+            return match.notified if match else True
 
     def check_user_is_admin(self, user_id: int) -> bool:
         with self.SessionLocal() as db:
             user = db.query(User).filter(User.id == user_id).first()
             return user.is_admin
 
-    def set_admin(self, user_id: int):
+    def set_admin(self, user_id: int, is_admin: bool = True):
         with self.SessionLocal() as db:
             user = db.query(User).filter(User.id == user_id).first()
-            user.is_admin = True
+            user.is_admin = is_admin
             db.commit()
             db.refresh(user)
 
@@ -438,10 +852,56 @@ class DatabaseManager:
                 return True
             return False
 
+    def get_user_profile(self, user_id: int) -> tuple[int, bool, list[int], list[int]] | None:
+        with self.SessionLocal() as db:
+            user = db.execute(select(User.time_zone, User.is_admin).where(User.id == user_id)).first()
+            if not user:
+                return None
+            event_ids = db.execute(
+                select(UserEventSubscription.event_id).where(UserEventSubscription.user_id == user_id)
+            ).scalars().all()
+            team_ids = db.execute(
+                select(UserTeamSubscription.team_id).where(UserTeamSubscription.user_id == user_id)
+            ).scalars().all()
+            return user.time_zone or 0, bool(user.is_admin), list(event_ids), list(team_ids)
+
     def get_timezone(self, user_id: int) -> int:
         with self.SessionLocal() as db:
             user = db.query(User).filter(User.id == user_id).first()
             if not user.time_zone:
                 self.set_timezone(user_id, 0)
                 return 0
-            return user.time_zone
\ No newline at end of file
+            return user.time_zone
+
+
+class AsyncDatabaseManager:
+    def __init__(self, manager: DatabaseManager, workers: int = 4):
+        self.manager = manager
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='db')
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.manager, name)
+        if not callable(attr) or name.startswith('_'):
+            return attr
+
+        def measured(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return attr(*args, **kwargs)
+            except Exception:
+                DB_ERRORS.inc(method=name)
+                raise
+            finally:
+                DB_SECONDS.observe(time.perf_counter() - started, method=name)
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(measured, *args, **kwargs))
+
+        setattr(self, name, call)
+        return call
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.manager.engine.dispose()
\ No newline at end of file
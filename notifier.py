@@ -0,0 +1,120 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramRetryAfter
+from aiogram.types import InlineKeyboardMarkup
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def acquire(self) -> bool:
+        waited = False
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    waited = True
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                waited = True
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+@dataclass
+class DeliveryStats:
+    sent: int = 0
+    failed: int = 0
+    throttled: int = 0
+    latencies: list[float] = field(default_factory=list)
+
+    def p95(self) -> float:
+        if not self.latencies:
+            return 0.0
+        latencies = sorted(self.latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+
+    def __str__(self):
+        return f"sent={self.sent} failed={self.failed} throttled={self.throttled} p95={self.p95() * 1000:.0f}ms"
+
+
+class Notifier:
+    def __init__(self, bot: Bot, workers: int = 8, global_rate: float = 30, chat_interval: float = 1.0,
+                 max_attempts: int = 3):
+        self.bot = bot
+        self.workers = workers
+        self.chat_interval = chat_interval
+        self.max_attempts = max_attempts
+        self._bucket = TokenBucket(global_rate)
+        self._chat_ready_at: dict[int, float] = {}
+
+    async def _wait_for_chat(self, chat_id: int) -> bool:
+        now = time.monotonic()
+        if len(self._chat_ready_at) > 10000:
+            self._chat_ready_at = {chat: ready for chat, ready in self._chat_ready_at.items() if ready > now}
+        ready_at = self._chat_ready_at.get(chat_id, 0.0)
+        self._chat_ready_at[chat_id] = max(now, ready_at) + self.chat_interval
+        if ready_at > now:
+            await asyncio.sleep(ready_at - now)
+            return True
+        return False
+
+    async def _send(self, chat_id: int, text: str, reply_markup: InlineKeyboardMarkup | None,
+                    stats: DeliveryStats) -> tuple[str, bool] | None:
+        error = None
+        for attempt in range(1, self.max_attempts + 1):
+            throttled = await self._bucket.acquire()
+            if await self._wait_for_chat(chat_id) or throttled:
+                stats.throttled += 1
+            started = time.perf_counter()
+            try:
+                await self.bot.send_message(chat_id, text, reply_markup=reply_markup)
+                stats.latencies.append(time.perf_counter() - started)
+                stats.sent += 1
+                return None
+            except TelegramRetryAfter as e:
+                stats.throttled += 1
+                self._bucket.pause(e.retry_after)
+                error = str(e)
+            except (TelegramForbiddenError, TelegramBadRequest) as e:
+                stats.failed += 1
+                return str(e), True
+            except Exception as e:
+                error = str(e)
+                await asyncio.sleep(min(2 ** attempt, 30))
+        stats.failed += 1
+        return error or 'unknown error', False
+
+    async def send(self, text: str, reply_markup: InlineKeyboardMarkup | None, chat_ids: list[int],
+                   stats: DeliveryStats,
+                   on_result: Callable[[int, tuple[str, bool] | None], Awaitable[None]] | None = None
+                   ) -> list[tuple[int, str, bool]]:
+        failures = []
+        pending = iter(chat_ids)
+
+        async def worker():
+            for chat_id in pending:
+                failure = await self._send(chat_id, text, reply_markup, stats)
+                if failure:
+                    failures.append((chat_id, *failure))
+                if on_result is not None:
+                    await on_result(chat_id, failure)
+
+        await asyncio.gather(*(worker() for _ in range(min(self.workers, len(chat_ids)))))
+        return failures
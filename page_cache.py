@@ -0,0 +1,84 @@
+import hashlib
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+
+
+@dataclass
+class CachedPage:
+    url: str
+    body: str
+    etag: str | None
+    last_modified: str | None
+    fetched_at: float
+    content_hash: str
+
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+def content_hash(body: str) -> str:
+    return hashlib.sha256(body.encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+class PageCache:
+    def __init__(self, path: str, max_entries: int = 256):
+        self.path = path
+        self.max_entries = max_entries
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS page (
+                url TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                content_hash TEXT NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS ix_page_last_access ON page (last_access)")
+        self._db.commit()
+
+    def get(self, url: str) -> CachedPage | None:
+        row = self._db.execute(
+            "SELECT url, body, etag, last_modified, fetched_at, content_hash FROM page WHERE url = ?", (url,)
+        ).fetchone()
+        if not row:
+            return None
+        self._db.execute("UPDATE page SET last_access = ? WHERE url = ?", (time.time(), url))
+        self._db.commit()
+        return CachedPage(*row)
+
+    def put(self, url: str, body: str, etag: str | None = None, last_modified: str | None = None) -> CachedPage:
+        now = time.time()
+        page = CachedPage(url, body, etag, last_modified, now, content_hash(body))
+        self._db.execute(
+            "INSERT OR REPLACE INTO page (url, body, etag, last_modified, fetched_at, content_hash, last_access) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (page.url, page.body, page.etag, page.last_modified, page.fetched_at, page.content_hash, now)
+        )
+        self._db.execute(
+            "DELETE FROM page WHERE url NOT IN (SELECT url FROM page ORDER BY last_access DESC LIMIT ?)",
+            (self.max_entries,)
+        )
+        self._db.commit()
+        return page
+
+    def touch(self, url: str):
+        now = time.time()
+        self._db.execute("UPDATE page SET fetched_at = ?, last_access = ? WHERE url = ?", (now, now, url))
+        self._db.commit()
+
+    def forget(self, url: str):
+        self._db.execute("DELETE FROM page WHERE url = ?", (url,))
+        self._db.commit()
+
+    def __len__(self) -> int:
+        return self._db.execute("SELECT COUNT(*) FROM page").fetchone()[0]
+
+    def close(self):
+        self._db.close()
@@ -1,174 +1,338 @@
-from bs4 import BeautifulSoup
-from playwright.async_api import async_playwright
+from dataclasses import dataclass, field
+from typing import Callable
+from lxml import etree, html
+from browser import browser_manager
 from logger import logger
+from metrics import PARSER_SECONDS, timed
 
 class ParserError(Exception):
     def __str__(self):
         return 'HTML content not found'
 
 async def getting_html_with_playwright(url: str) -> str | None:
-    browser = None
     logger.info(f"get page {url}")
     try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(
-                headless=True
-            )
-
-            page = await browser.new_page(
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-            )
-
-            await page.goto(url, timeout=60000, wait_until="networkidle")
-
-            html_content = await page.content()
-            logger.info(f"page loaded successfully {url}")
-            return html_content
+        html_content = await browser_manager.get_html(url, timeout=60000, wait_until="networkidle")
+        logger.info(f"page loaded successfully {url}")
+        return html_content
     except Exception as e:
         logger.error(f'Error download page {url}\n{e}')
         return None
-    finally:
-        if browser:
-            await browser.close()
 
 
-def get_live_matches(html_content: str) -> list[dict]:
-    if not html_content:
-        raise ParserError
+def _cls(tag: str, *classes: str) -> str:
+    predicates = ' and '.join(f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')" for name in classes)
+    return f"{tag}[{predicates}]"
+
+
+def _nth(*steps, root: str = '.') -> str:
+    expression = root
+    for step in steps:
+        step, index = step if isinstance(step, tuple) else (step, 1)
+        expression = f"({expression}//{step})[{index}]"
+    return expression
+
+
+def _first(xpath: etree.XPath, element) -> etree._Element | None:
+    result = xpath(element)
+    return result[0] if result else None
+
+
+_STRING = etree.XPath('string()')
 
-    soup = BeautifulSoup(html_content, 'lxml')
-    live_matches_data = []
 
-    live_matches_container = soup.find('div', class_='matches-list-column').find('div', class_='liveMatches')
+def _text(element) -> str:
+    return str(_STRING(element))
 
-    if live_matches_container:
-        live_matches = live_matches_container.find_all('div', class_='match-wrapper live-match-container')
 
-        for j, match in enumerate(live_matches):
-            live_matches_data.append(dict())
-            live_matches_data[j]['url'] = match.find('a').get('href')
-            live_matches_data[j]['event'] = match.find('div', class_='match-event text-ellipsis') \
-                .find('div', class_='text-ellipsis').text
-            live_matches_data[j]['format'] = match.find('div', class_='match-meta').text
-            team_in_live = match.find_all('div', class_='match-teamname text-ellipsis')
-            for i, team in enumerate(team_in_live):
-                live_matches_data[j][f'team{i + 1}'] = team.text
+_LIVE_MATCHES = etree.XPath(_nth(_cls('div', 'matches-list-column'), _cls('div', 'liveMatches'), root='')
+                            + f"//{_cls('div', 'match-wrapper', 'live-match-container')}")
+_LIVE_URL = etree.XPath(_nth('a') + "/@href")
+_LIVE_EVENT = etree.XPath(_nth(_cls('div', 'match-event', 'text-ellipsis'), _cls('div', 'text-ellipsis')))
+_LIVE_TEAMS = etree.XPath(f".//{_cls('div', 'match-teamname', 'text-ellipsis')}")
 
-    return live_matches_data
+_UPCOMING_MATCHES = etree.XPath(f"//{_cls('div', 'match-zone-wrapper')}")
+_UPCOMING_URL = etree.XPath(_nth(_cls('div', 'match'), 'a') + "/@href")
+_UPCOMING_TEAM1 = etree.XPath(_nth(_cls('div', 'match-team', 'team1'), _cls('div', 'text-ellipsis')))
+_UPCOMING_TEAM2 = etree.XPath(_nth(_cls('div', 'match-team', 'team2'), _cls('div', 'text-ellipsis')))
+_UPCOMING_EVENT = etree.XPath(_nth(_cls('div', 'match-event')) + "/@data-event-headline")
 
+_MATCH_META = etree.XPath(_nth(_cls('div', 'match-meta')))
+_MATCHES_WITH_STREAMS = etree.XPath(f"//{_cls('div', 'live-match-container')}[.//@data-stream-embed]"
+                                    f" | //{_cls('div', 'match-zone-wrapper')}[.//@data-stream-embed]")
+_STREAM_EMBEDS = etree.XPath(f".//{_cls('div', 'stream-box-embed')}")
 
-def get_all_upcoming_matches(html_content: str) -> list[dict]:
-    if not html_content:
+_RANKED_TEAMS = etree.XPath(_nth(_cls('div', 'ranking'), root='') + f"//{_cls('div', 'ranked-team', 'standard-box')}")
+_RANKED_TEAM_NAME = etree.XPath(_nth(_cls('span', 'name')))
+
+_STREAM_BOXES = etree.XPath(_nth(_cls('div', 'streams'), root='') + f"//{_cls('div', 'stream-box')}")
+_STREAM_EMBED = etree.XPath(_nth(_cls('div', 'stream-box-embed')))
+
+_ONGOING_EVENT_NAME = etree.XPath(_nth(_cls('div', 'text-ellipsis')))
+_ONGOING_EVENT_START = etree.XPath(_nth(_cls('span', 'col-desc'), 'span', 'span') + "/@data-unix")
+_ONGOING_EVENT_END = etree.XPath(_nth(_cls('span', 'col-desc'), 'span', ('span', 2), 'span') + "/@data-unix")
+
+_BIG_EVENT_NAME = etree.XPath(_nth(_cls('div', 'big-event-name')))
+_BIG_EVENT_START = etree.XPath(_nth(_cls('td', 'col-value', 'col-date'), 'span') + "/@data-unix")
+_BIG_EVENT_END = etree.XPath(_nth(_cls('td', 'col-value', 'col-date'), ('span', 2), 'span') + "/@data-unix")
+
+_SMALL_EVENT_NAME = _ONGOING_EVENT_NAME
+_SMALL_EVENT_START = etree.XPath(_nth(_cls('tr', 'eventDetails'), (_cls('span', 'col-desc'), 2), 'span', 'span')
+                                 + "/@data-unix")
+_SMALL_EVENT_END = etree.XPath(_nth((_cls('span', 'col-desc'), 2), 'span', ('span', 2), 'span') + "/@data-unix")
+
+
+def parse_html(html_content) -> etree._Element:
+    if html_content is None or isinstance(html_content, (str, bytes)) and not html_content:
         raise ParserError
+    if isinstance(html_content, etree._Element):
+        return html_content
+    return html.document_fromstring(html_content)
+
+
+@dataclass(slots=True)
+class UpcomingMatch:
+    url: str
+    event: str | None
+    team1: str
+    team2: str
+    format: str
+    start_time: int
+
+    def as_dict(self) -> dict:
+        return {'url': self.url, 'team1': self.team1, 'team2': self.team2, 'format': self.format,
+                'event': self.event, 'start_time': self.start_time}
 
-    soup = BeautifulSoup(html_content, 'lxml')
-    match_data = []
 
-    matches = soup.find_all('div', class_='match-zone-wrapper')
+@dataclass(slots=True)
+class LiveMatch:
+    url: str
+    event: str
+    format: str
+    teams: tuple[str, ...]
 
-    remove_elems = 0
-    for j, match in enumerate(matches):
+    def as_dict(self) -> dict:
+        data = {'url': self.url, 'event': self.event, 'format': self.format}
+        for i, team in enumerate(self.teams):
+            data[f'team{i + 1}'] = team
+        return data
+
+
+@dataclass(slots=True)
+class MatchesPage:
+    upcoming: list[UpcomingMatch] = field(default_factory=list)
+    live: list[LiveMatch] = field(default_factory=list)
+    stream_hints: dict[str, dict[str, str]] = field(default_factory=dict)
+    extras: dict[str, object] = field(default_factory=dict)
+
+
+MATCHES_PAGE_EXTRACTORS: dict[str, Callable[[etree._Element], object]] = {}
+
+
+def matches_page_extractor(name: str):
+    def register(func: Callable[[etree._Element], object]):
+        MATCHES_PAGE_EXTRACTORS[name] = func
+        return func
+    return register
+
+
+@matches_page_extractor('live')
+def extract_live_matches(root: etree._Element) -> list[LiveMatch]:
+    live_matches = []
+
+    for match in _LIVE_MATCHES(root):
+        url = _LIVE_URL(match)
+        event = _first(_LIVE_EVENT, match)
+        meta = _first(_MATCH_META, match)
+        if not url or event is None or meta is None:
+            continue
+        live_matches.append(LiveMatch(url=str(url[0]), event=_text(event), format=_text(meta),
+                                      teams=tuple(_text(team) for team in _LIVE_TEAMS(match))))
+
+    return live_matches
+
+
+@matches_page_extractor('upcoming')
+def extract_upcoming_matches(root: etree._Element) -> list[UpcomingMatch]:
+    upcoming_matches = []
+
+    for match in _UPCOMING_MATCHES(root):
+        url = _UPCOMING_URL(match)
+        team1 = _first(_UPCOMING_TEAM1, match)
+        team2 = _first(_UPCOMING_TEAM2, match)
+        meta = _first(_MATCH_META, match)
+        event = _UPCOMING_EVENT(match)
+        start_time = match.get('data-zonedgrouping-entry-unix')
+        if not url or team1 is None or team2 is None or meta is None or not start_time:
+            continue
         try:
-            match_data.append(dict())
-            match_data[j - remove_elems]['url'] = match.find('div', class_='match').find('a').get('href')
-            match_data[j - remove_elems]['team1'] = match.find('div', class_='match-team team1') \
-                .find('div', class_='text-ellipsis').text
-            match_data[j - remove_elems]['team2'] = match.find('div', class_='match-team team2') \
-                .find('div', class_='text-ellipsis').text
-            match_data[j - remove_elems]['format'] = match.find('div', class_='match-meta').text
-            match_data[j - remove_elems]['event'] = match.find('div', class_='match-event').get('data-event-headline')
-            match_data[j - remove_elems]['start_time'] = int(match.get('data-zonedgrouping-entry-unix'))
-        except BaseException as e:
-            match_data.pop()
-            remove_elems += 1
-        if not match_data[-1]:
-            remove_elems += 1
-            match_data.pop()
-
-    return match_data
-
-
-def get_teams(html_content: str) -> list[str]:
-    if not html_content:
-        raise ParserError
+            start_time = int(start_time)
+        except ValueError:
+            continue
+        upcoming_matches.append(UpcomingMatch(url=str(url[0]), event=str(event[0]) if event else None,
+                                              team1=_text(team1), team2=_text(team2), format=_text(meta),
+                                              start_time=start_time))
 
-    soup = BeautifulSoup(html_content, 'lxml')
-    teams = []
+    return upcoming_matches
 
-    teams_box = soup.find("div", class_="ranking").find_all("div", class_="ranked-team standard-box")
 
-    for box in teams_box:
-        teams.append(box.find("span", class_="name").text)
+@matches_page_extractor('stream_hints')
+def extract_stream_hints(root: etree._Element) -> dict[str, dict[str, str]]:
+    hints = {}
 
-    return teams
+    for match in _MATCHES_WITH_STREAMS(root):
+        url = _LIVE_URL(match)
+        if not url:
+            continue
+        for box in _STREAM_EMBEDS(match):
+            if box.get('data-stream-embed'):
+                hints.setdefault(str(url[0]), {})[_text(box)] = box.get('data-stream-embed')
 
+    return hints
 
-def get_stream_urls(html_content: str) -> dict[str]:
-    if not html_content:
-        raise ParserError
 
-    soup = BeautifulSoup(html_content, 'lxml')
-    urls = {}
+@timed(PARSER_SECONDS, parser='parse_matches_page')
+def parse_matches_page(html_content, extractors: tuple[str, ...] | None = None) -> MatchesPage:
+    root = parse_html(html_content)
+    page = MatchesPage()
+
+    for name in extractors or MATCHES_PAGE_EXTRACTORS:
+        value = MATCHES_PAGE_EXTRACTORS[name](root)
+        if name in MatchesPage.__dataclass_fields__ and name != 'extras':
+            setattr(page, name, value)
+        else:
+            page.extras[name] = value
+
+    return page
 
-    streams = soup.find("div", class_="streams").find_all("div", class_="stream-box")
 
-    for stream in streams:
-        box = stream.find("div", class_="stream-box-embed")
-        if not box:
+@timed(PARSER_SECONDS, parser='get_live_matches')
+def get_live_matches(html_content) -> list[dict]:
+    return [match.as_dict() for match in extract_live_matches(parse_html(html_content))]
+
+
+@timed(PARSER_SECONDS, parser='get_all_upcoming_matches')
+def get_all_upcoming_matches(html_content) -> list[dict]:
+    return [match.as_dict() for match in extract_upcoming_matches(parse_html(html_content))]
+
+
+@timed(PARSER_SECONDS, parser='get_teams')
+def get_teams(html_content) -> list[str]:
+    root = parse_html(html_content)
+    teams = []
+
+    for box in _RANKED_TEAMS(root):
+        name = _first(_RANKED_TEAM_NAME, box)
+        if name is None:
             continue
-        urls[box.text] = box.get("data-stream-embed")
+        teams.append(_text(name))
+
+    return teams
+
+
+@timed(PARSER_SECONDS, parser='get_stream_urls')
+def get_stream_urls(html_content) -> dict[str]:
+    root = parse_html(html_content)
+    urls = {}
+
+    for stream in _STREAM_BOXES(root):
+        box = _first(_STREAM_EMBED, stream)
+        if box is None:
+            continue
+        urls[_text(box)] = box.get("data-stream-embed")
 
     return urls
 
-def get_all_events(html_content: str) -> list[dict]:
-    if not html_content:
-        raise ParserError
 
-    soup = BeautifulSoup(html_content, 'lxml')
-    all_events = []
+def _extract_event(event, name_xpath: etree.XPath, start_xpath: etree.XPath, end_xpath: etree.XPath) -> dict | None:
+    name = _first(name_xpath, event)
+    start_date = start_xpath(event)
+    end_date = end_xpath(event)
+    if name is None or not start_date or not end_date:
+        return None
+    try:
+        return {'name': _text(name), 'start_date': int(start_date[0]), 'end_date': int(end_date[0])}
+    except ValueError:
+        return None
 
-    live_events = soup.find_all('a', class_='a-reset ongoing-event')
-    i = -1
-    for event in live_events:
-        try:
-            all_events.append(dict())
-            i += 1
-            all_events[i]['name'] = event.find('div', class_='text-ellipsis').text
-            all_events[i]['start_date'] = int(event.find('span', class_='col-desc').find('span').find('span')\
-                .get('data-unix'))
-            all_events[i]['end_date'] = int(event.find('span', class_='col-desc').find('span').find_all('span')[1]\
-                                            .find('span').get('data-unix'))
-        except BaseException as e:
-            i -= 1
-            all_events.pop()
-
-    big_events = soup.find_all('div', class_='big-event-info')
-    for event in big_events:
-        try:
-            all_events.append(dict())
-            i += 1
-            all_events[i]['name'] = event.find('div', class_='big-event-name').text
-            all_events[i]['start_date'] = int(event.find('td', class_='col-value col-date').find('span')\
-                                              .get('data-unix'))
-            all_events[i]['end_date'] = int(event.find('td', class_='col-value col-date').find_all('span')[1]\
-                                            .find('span').get('data-unix'))
-        except BaseException as e:
-            i -= 1
-            all_events.pop()
-
-    small_events = soup.find_all('a', class_='a-reset small-event standard-box')
-    for event in small_events:
-        try:
-            all_events.append(dict())
-            i += 1
-            all_events[i]['name'] = event.find('div', class_='text-ellipsis').text
-            all_events[i]['start_date'] = int(event.find('tr', class_='eventDetails')\
-                                              .find_all('span', class_='col-desc')[1].find('span').find('span')\
-                                              .get('data-unix'))
-            all_events[i]['end_date'] = int(event.find_all('span', class_='col-desc')[1].find('span').find_all('span')[1]\
-                                            .find('span').get('data-unix'))
-        except BaseException as e:
-            i -= 1
-            all_events.pop()
-
-    return all_events
\ No newline at end of file
+
+EVENT_CATEGORIES = {
+    'ongoing': ('a', frozenset({'a-reset', 'ongoing-event'}),
+                _ONGOING_EVENT_NAME, _ONGOING_EVENT_START, _ONGOING_EVENT_END),
+    'big': ('div', frozenset({'big-event-info'}),
+            _BIG_EVENT_NAME, _BIG_EVENT_START, _BIG_EVENT_END),
+    'small': ('a', frozenset({'a-reset', 'small-event', 'standard-box'}),
+              _SMALL_EVENT_NAME, _SMALL_EVENT_START, _SMALL_EVENT_END),
+}
+EVENTS_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass(slots=True)
+class EventsParseStats:
+    parsed: dict[str, int] = field(default_factory=lambda: dict.fromkeys(EVENT_CATEGORIES, 0))
+    skipped: dict[str, int] = field(default_factory=lambda: dict.fromkeys(EVENT_CATEGORIES, 0))
+
+    def __str__(self):
+        return ', '.join(f"{category}: {self.parsed[category]} parsed, {self.skipped[category]} skipped"
+                         for category in EVENT_CATEGORIES)
+
+
+def _event_category(element) -> str | None:
+    classes = element.get('class')
+    if not classes:
+        return None
+    classes = set(classes.split())
+    for category, (tag, required, *_) in EVENT_CATEGORIES.items():
+        if element.tag == tag and required <= classes:
+            return category
+    return None
+
+
+def _discard(element):
+    element.clear()
+    parent = element.getparent()
+    if parent is not None:
+        while element.getprevious() is not None:
+            del parent[0]
+
+
+@timed(PARSER_SECONDS, parser='get_all_events')
+def get_all_events(html_content, stats: EventsParseStats | None = None) -> list[dict]:
+    if html_content is None or isinstance(html_content, (str, bytes)) and not html_content:
+        raise ParserError
+    if isinstance(html_content, etree._Element):
+        html_content = etree.tostring(html_content)
+    stats = stats if stats is not None else EventsParseStats()
+    events_by_category = {category: [] for category in EVENT_CATEGORIES}
+    parser = etree.HTMLPullParser(events=('start', 'end'))
+    open_events = 0
+
+    def drain():
+        nonlocal open_events
+        for action, element in parser.read_events():
+            category = _event_category(element)
+            if action == 'start':
+                if category:
+                    open_events += 1
+                continue
+            if not category:
+                if not open_events:
+                    _discard(element)
+                continue
+            open_events -= 1
+            record = _extract_event(element, *EVENT_CATEGORIES[category][2:])
+            if record:
+                stats.parsed[category] += 1
+                events_by_category[category].append(record)
+            else:
+                stats.skipped[category] += 1
+            if not open_events:
+                _discard(element)
+
+    for offset in range(0, len(html_content), EVENTS_CHUNK_SIZE):
+        parser.feed(html_content[offset:offset + EVENTS_CHUNK_SIZE])
+        drain()
+    parser.close()
+    drain()
+
+    return [record for records in events_by_category.values() for record in records]
@@ -0,0 +1,139 @@
+import asyncio
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime
+from logger import logger
+from metrics import add_observer, remove_observer
+
+UPDATE_CYCLE = 'update_data'
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_name(frame))
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class ProfileSession:
+    def __init__(self, target: str, sample_interval: float):
+        self.target = target
+        self.profile = cProfile.Profile()
+        self.sampler = StackSampler(sample_interval)
+        self.spans: list[dict] = []
+        self.started = time.perf_counter()
+
+    def observe(self, name: str, labels: dict, seconds: float):
+        try:
+            track = asyncio.current_task().get_name()
+        except RuntimeError:
+            track = threading.current_thread().name
+        label = ','.join(str(value) for value in labels.values())
+        self.spans.append({
+            'name': f"{name}:{label}" if label else name,
+            'cat': name,
+            'ph': 'X',
+            'ts': round((time.perf_counter() - seconds - self.started) * 1e6),
+            'dur': round(seconds * 1e6),
+            'pid': os.getpid(),
+            'tid': track,
+        })
+
+    def start(self):
+        add_observer(self.observe)
+        self.sampler.start()
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+        self.sampler.stop()
+        remove_observer(self.observe)
+
+    def summary(self, limit: int = 25) -> str:
+        stream = io.StringIO()
+        pstats.Stats(self.profile, stream=stream).sort_stats('cumulative').print_stats(limit)
+        return stream.getvalue()
+
+    def save(self, directory: str) -> list[str]:
+        os.makedirs(directory, exist_ok=True)
+        base = os.path.join(directory, f"{self.target}-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+        self.profile.dump_stats(f"{base}.prof")
+        with open(f"{base}.collapsed", 'w') as file:
+            file.write(self.sampler.collapsed())
+        with open(f"{base}.trace.json", 'w') as file:
+            json.dump({'traceEvents': self.spans, 'displayTimeUnit': 'ms'}, file)
+        return [f"{base}.prof", f"{base}.collapsed", f"{base}.trace.json"]
+
+
+class Profiler:
+    def __init__(self, directory: str, sample_interval: float = 0.005):
+        self.directory = directory
+        self.sample_interval = sample_interval
+        self.last_files: list[str] = []
+        self._armed: set[str] = set()
+        self._active: ProfileSession | None = None
+
+    def arm(self, target: str = UPDATE_CYCLE):
+        self._armed.add(target)
+        logger.info(f"profiler armed for the next {target}")
+
+    @asynccontextmanager
+    async def run(self, target: str):
+        if target not in self._armed or self._active is not None:
+            yield
+            return
+        self._armed.discard(target)
+        session = self._active = ProfileSession(target, self.sample_interval)
+        logger.info(f"profiling {target}")
+        session.start()
+        try:
+            yield
+        finally:
+            session.stop()
+            self._active = None
+            elapsed = time.perf_counter() - session.started
+            try:
+                self.last_files = await asyncio.get_running_loop().run_in_executor(None, session.save,
+                                                                                   self.directory)
+                logger.info(f"profile of {target} ({elapsed:.1f}s) saved to {', '.join(self.last_files)}\n"
+                            f"{session.summary()}")
+            except Exception as err:
+                logger.error(f"Error saving profile of {target} {err}")
@@ -0,0 +1,108 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+
+@dataclass(slots=True)
+class UserProfile:
+    time_zone: int = 0
+    is_admin: bool = False
+    event_ids: set[int] = field(default_factory=set)
+    team_ids: set[int] = field(default_factory=set)
+
+
+class ProfileCache:
+    def __init__(self, db_manager, max_entries: int = 10000, ttl: float = 600):
+        self.db_manager = db_manager
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._profiles: OrderedDict[int, tuple[float, UserProfile]] = OrderedDict()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, user_id: int) -> UserProfile:
+        entry = self._profiles.get(user_id)
+        if entry and entry[0] > time.monotonic():
+            self._profiles.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        generation = self._generation
+        row = await self.db_manager.get_user_profile(user_id)
+        profile = UserProfile()
+        if row:
+            time_zone, is_admin, event_ids, team_ids = row
+            profile = UserProfile(time_zone, is_admin, set(event_ids), set(team_ids))
+            if generation == self._generation:
+                self._store(user_id, profile)
+        return profile
+
+    def _store(self, user_id: int, profile: UserProfile):
+        self._profiles[user_id] = (time.monotonic() + self.ttl, profile)
+        self._profiles.move_to_end(user_id)
+        while len(self._profiles) > self.max_entries:
+            self._profiles.popitem(last=False)
+
+    def _written(self, user_id: int) -> UserProfile | None:
+        self._generation += 1
+        entry = self._profiles.get(user_id)
+        return entry[1] if entry else None
+
+    def invalidate(self, user_id: int | None = None):
+        self._generation += 1
+        if user_id is None:
+            self._profiles.clear()
+        else:
+            self._profiles.pop(user_id, None)
+
+    async def get_timezone(self, user_id: int) -> int:
+        return (await self.get(user_id)).time_zone
+
+    async def is_admin(self, user_id: int) -> bool:
+        return (await self.get(user_id)).is_admin
+
+    async def set_timezone(self, user_id: int, time_zone: int) -> bool:
+        updated = await self.db_manager.set_timezone(user_id, time_zone)
+        profile = self._written(user_id)
+        if updated and profile:
+            profile.time_zone = time_zone
+        return updated
+
+    async def set_admin(self, user_id: int, is_admin: bool = True):
+        await self.db_manager.set_admin(user_id, is_admin)
+        self.invalidate(user_id)
+
+    async def subscribe_to_event(self, user_id: int, event_id: int) -> str:
+        name = await self.db_manager.subscribe_user_to_event(user_id, event_id)
+        profile = self._written(user_id)
+        if name and profile:
+            profile.event_ids.add(event_id)
+        return name
+
+    async def subscribe_to_team(self, user_id: int, team_id: int) -> str:
+        name = await self.db_manager.subscribe_user_to_team(user_id, team_id)
+        profile = self._written(user_id)
+        if name and profile:
+            profile.team_ids.add(team_id)
+        return name
+
+    async def unsubscribe_from_event(self, user_id: int, event_id: int) -> bool:
+        removed = await self.db_manager.unsubscribe_user_from_event(user_id, event_id)
+        profile = self._written(user_id)
+        if profile:
+            profile.event_ids.discard(event_id)
+        return removed
+
+    async def unsubscribe_from_team(self, user_id: int, team_id: int) -> bool:
+        removed = await self.db_manager.unsubscribe_user_from_team(user_id, team_id)
+        profile = self._written(user_id)
+        if profile:
+            profile.team_ids.discard(team_id)
+        return removed
+
+    def stats(self) -> dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._profiles)}
+
+    def __str__(self):
+        return f"profile cache: {self.hits} hits, {self.misses} misses, {len(self._profiles)} cached"
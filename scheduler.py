@@ -0,0 +1,101 @@
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+from logger import logger
+
+
+@dataclass(order=True)
+class Job:
+    when: float
+    seq: int
+    key: str = field(compare=False)
+    callback: Callable[[], Awaitable[float | None]] = field(compare=False)
+    interval: float | None = field(default=None, compare=False)
+
+
+class Scheduler:
+    def __init__(self, min_interval: float = 30, jitter: float = 0.1):
+        self.min_interval = min_interval
+        self.jitter = jitter
+        self._heap: list[Job] = []
+        self._jobs: dict[str, Job] = {}
+        self._running: set[str] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+
+    def _push(self, job: Job):
+        self._jobs[job.key] = job
+        heapq.heappush(self._heap, job)
+        if len(self._heap) > 2 * len(self._jobs) + 16:
+            self._heap = [job for job in self._heap if self._jobs.get(job.key) is job]
+            heapq.heapify(self._heap)
+        self._wakeup.set()
+
+    def _with_jitter(self, delay: float) -> float:
+        delay = max(delay, self.min_interval)
+        return delay + random.uniform(0, delay * self.jitter)
+
+    def schedule(self, key: str, when: float, callback: Callable[[], Awaitable[float | None]]):
+        job = self._jobs.get(key)
+        if job is not None and job.when == when and job.interval is None:
+            return
+        self._push(Job(when, next(self._seq), key, callback))
+
+    def every(self, key: str, interval: float, callback: Callable[[], Awaitable[float | None]], delay: float = 0):
+        self._push(Job(time.time() + delay, next(self._seq), key, callback, interval))
+
+    def cancel(self, key: str):
+        self._jobs.pop(key, None)
+
+    def pending(self, prefix: str = '') -> list[str]:
+        return [key for key in self._jobs if key.startswith(prefix)]
+
+    def next_run(self, prefix: str = '') -> float | None:
+        times = [job.when for key, job in self._jobs.items() if key.startswith(prefix)]
+        return min(times) if times else None
+
+    async def _run_job(self, job: Job):
+        self._running.add(job.key)
+        next_delay = None
+        try:
+            next_delay = await job.callback()
+        except Exception as err:
+            logger.error(f"Error in scheduled job {job.key} {err}")
+        finally:
+            self._running.discard(job.key)
+        if self._jobs.get(job.key) is not job:
+            return
+        if job.interval is None:
+            del self._jobs[job.key]
+            return
+        delay = self._with_jitter(next_delay if next_delay is not None else job.interval)
+        self._push(Job(time.time() + delay, next(self._seq), job.key, job.callback, job.interval))
+
+    async def run(self):
+        while True:
+            while self._heap and self._jobs.get(self._heap[0].key) is not self._heap[0]:
+                heapq.heappop(self._heap)
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+            delay = self._heap[0].when - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            job = heapq.heappop(self._heap)
+            if job.key in self._running:
+                self._push(Job(time.time() + max(self.min_interval, 1), next(self._seq), job.key, job.callback,
+                               job.interval))
+                continue
+            task = asyncio.create_task(self._run_job(job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
@@ -0,0 +1,101 @@
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Iterable
+
+
+def _add(index: dict[int, array], key: int, user_id: int) -> bool:
+    users = index.get(key)
+    if users is None:
+        index[key] = array('q', [user_id])
+        return True
+    position = bisect_left(users, user_id)
+    if position < len(users) and users[position] == user_id:
+        return False
+    users.insert(position, user_id)
+    return True
+
+
+def _remove(index: dict[int, array], key: int, user_id: int) -> bool:
+    users = index.get(key)
+    if users is None:
+        return False
+    position = bisect_left(users, user_id)
+    if position == len(users) or users[position] != user_id:
+        return False
+    del users[position]
+    if not users:
+        del index[key]
+    return True
+
+
+def _build(pairs: Iterable[tuple[int, int]]) -> dict[int, array]:
+    grouped = defaultdict(set)
+    for key, user_id in pairs:
+        grouped[key].add(user_id)
+    return {key: array('q', sorted(users)) for key, users in grouped.items()}
+
+
+class SubscriberIndex:
+    def __init__(self):
+        self._by_event: dict[int, array] = {}
+        self._by_team: dict[int, array] = {}
+        self.loaded = False
+        self.version = 0
+
+    def load(self, event_pairs: Iterable[tuple[int, int]], team_pairs: Iterable[tuple[int, int]]):
+        self._by_event = _build(event_pairs)
+        self._by_team = _build(team_pairs)
+        self.loaded = True
+        self.version += 1
+
+    def add_event(self, user_id: int, event_id: int) -> bool:
+        self.version += 1
+        return _add(self._by_event, event_id, user_id)
+
+    def remove_event(self, user_id: int, event_id: int) -> bool:
+        self.version += 1
+        return _remove(self._by_event, event_id, user_id)
+
+    def add_team(self, user_id: int, team_id: int) -> bool:
+        self.version += 1
+        return _add(self._by_team, team_id, user_id)
+
+    def remove_team(self, user_id: int, team_id: int) -> bool:
+        self.version += 1
+        return _remove(self._by_team, team_id, user_id)
+
+    def recipients(self, event_id: int, team_ids: Iterable[int]) -> set[int]:
+        users = set(self._by_event.get(event_id, ()))
+        for team_id in team_ids:
+            users.update(self._by_team.get(team_id, ()))
+        return users
+
+    def diff(self, other: 'SubscriberIndex') -> dict[str, int]:
+        counts = {'missing': 0, 'extra': 0}
+        for index, expected in ((self._by_event, other._by_event), (self._by_team, other._by_team)):
+            for key in expected.keys() | index.keys():
+                actual = index.get(key, array('q'))
+                wanted = expected.get(key, array('q'))
+                if actual == wanted:
+                    continue
+                counts['missing'] += len(set(wanted) - set(actual))
+                counts['extra'] += len(set(actual) - set(wanted))
+        return counts
+
+    def replace(self, other: 'SubscriberIndex'):
+        self._by_event = other._by_event
+        self._by_team = other._by_team
+        self.loaded = other.loaded
+        self.version += 1
+
+    def stats(self) -> dict[str, int]:
+        return {'events': len(self._by_event), 'teams': len(self._by_team),
+                'subscriptions': sum(map(len, self._by_event.values())) + sum(map(len, self._by_team.values())),
+                'bytes': sum(users.buffer_info()[1] * users.itemsize
+                             for index in (self._by_event, self._by_team) for users in index.values())}
+
+    def __str__(self):
+        stats = self.stats()
+        return f"subscriber index: {stats['subscriptions']} subscriptions over {stats['events']} events " \
+               f"and {stats['teams']} teams, {stats['bytes'] / 1024:.0f} KiB"
@@ -0,0 +1,49 @@
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, 'benchmarks', 'fixtures')
+
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+WORK_DIR = tempfile.mkdtemp(prefix='hltv-tests-')
+os.chdir(WORK_DIR)
+os.makedirs('logs', exist_ok=True)
+os.environ.setdefault('TOKEN', '123456:TEST')
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(WORK_DIR, 'app.db'))
+os.environ.setdefault('PAGE_CACHE_PATH', os.path.join(WORK_DIR, 'page_cache.db'))
+os.environ.setdefault('METRICS_PORT', '0')
+
+
+def read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.fixture
+def manager(tmp_path):
+    from models import DatabaseManager
+    manager = DatabaseManager('sqlite:///' + str(tmp_path / 'app.db'))
+    yield manager
+    manager.engine.dispose()
+
+
+@pytest.fixture
+def seeded(manager):
+    start = datetime.now(timezone.utc) + timedelta(days=1)
+    event = manager.create_event('Major', start, start + timedelta(days=3))
+    for name in ('NAVI', 'Vitality', 'FaZe'):
+        manager.create_team(name)
+    teams = {team.name: team.id for team in manager.get_all_teams()}
+    for user_id in (1, 2, 3, 4):
+        manager.create_user(user_id)
+    manager.subscribe_user_to_event(1, event.id)
+    manager.subscribe_user_to_team(2, teams['NAVI'])
+    manager.subscribe_user_to_team(3, teams['Vitality'])
+    manager.subscribe_user_to_team(4, teams['FaZe'])
+    manager.create_match('Major', ['NAVI', 'Vitality'], 'https://www.hltv.org/matches/1/a', 'bo3', True, start)
+    return manager
@@ -0,0 +1,48 @@
+import asyncio
+from catalog import CatalogCache
+from models import AsyncDatabaseManager
+
+
+def test_page_warms_cache_and_pages_by_keyset(manager):
+    manager.sync_teams([f'Team {i}' for i in range(1, 16)])
+    db_manager = AsyncDatabaseManager(manager, workers=1)
+    catalog = CatalogCache(db_manager)
+
+    async def scenario():
+        first, total = await catalog.page('teams', 6)
+        second, _ = await catalog.page('teams', 6, after_id=first[-1].id)
+        back, _ = await catalog.page('teams', 6, before_id=second[0].id)
+        last, _ = await catalog.page('teams', 6, after_id=second[-1].id)
+        return first, total, second, back, last
+
+    first, total, second, back, last = asyncio.run(scenario())
+    db_manager.close()
+    assert total == 15
+    assert [row.name for row in first] == [f'Team {i}' for i in range(1, 7)]
+    assert [row.name for row in second] == [f'Team {i}' for i in range(7, 13)]
+    assert back == first
+    assert len(last) == 3
+    assert (catalog.misses, catalog.hits) == (1, 3)
+
+
+def test_invalidate_reloads_only_that_catalog(manager):
+    manager.sync_teams(['NAVI'])
+    db_manager = AsyncDatabaseManager(manager, workers=1)
+    catalog = CatalogCache(db_manager)
+
+    async def scenario():
+        before, _ = await catalog.page('teams', 10)
+        await catalog.page('events', 10)
+        manager.sync_teams(['NAVI', 'FaZe'])
+        cached, _ = await catalog.page('teams', 10)
+        catalog.invalidate('teams')
+        after, _ = await catalog.page('teams', 10)
+        team = await catalog.team(after[-1].id)
+        return before, cached, after, team
+
+    before, cached, after, team = asyncio.run(scenario())
+    db_manager.close()
+    assert cached == before
+    assert [row.name for row in after] == ['NAVI', 'FaZe']
+    assert team.name == 'FaZe'
+    assert catalog.versions == {'events': 0, 'teams': 1}
@@ -0,0 +1,21 @@
+import hashlib
+import json
+import pytest
+import bench_corpus
+from bench_corpus import PARSERS, cases, golden_path, read_page, to_json
+
+
+def test_corpus_matches_the_manifest():
+    with open(bench_corpus.MANIFEST, encoding='utf-8') as f:
+        manifest = json.load(f)
+    assert manifest['version'] >= 1
+    assert set(manifest['pages']) == {fixture for _, fixture, _ in cases()}
+    for name, page in manifest['pages'].items():
+        assert hashlib.sha256(read_page(name)).hexdigest() == page['sha256'], name
+
+
+@pytest.mark.parametrize('func_name,fixture', [(func_name, fixture) for func_name, fixture, _ in cases()])
+def test_parser_output_matches_golden(func_name, fixture):
+    with open(golden_path(func_name), encoding='utf-8') as f:
+        expected = json.load(f)
+    assert to_json(PARSERS[func_name](read_page(fixture).decode('utf-8'))) == expected
@@ -0,0 +1,48 @@
+import threading
+from metrics import Registry
+
+
+def test_label_values_are_escaped():
+    registry = Registry()
+    counter = registry.counter('errors_total', 'Errors', ('message',))
+    counter.inc(message='bad "quote" \\ path\nnext line')
+    assert 'errors_total{message="bad \\"quote\\" \\\\ path\\nnext line"} 1' in registry.render()
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    histogram = registry.histogram('job_seconds', 'Job latency', ('job',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value, job='a')
+    lines = registry.render().splitlines()
+    assert 'job_seconds_bucket{job="a",le="0.1"} 1' in lines
+    assert 'job_seconds_bucket{job="a",le="1.0"} 2' in lines
+    assert 'job_seconds_bucket{job="a",le="+Inf"} 3' in lines
+    assert 'job_seconds_count{job="a"} 3' in lines
+    assert histogram.totals() == {('a',): (3, 5.55)}
+
+
+def test_render_while_other_threads_add_series():
+    registry = Registry()
+    counter = registry.counter('requests_total', 'Requests', ('path',))
+    histogram = registry.histogram('request_seconds', 'Latency', ('path',))
+    started = threading.Barrier(5)
+
+    def writer(offset):
+        started.wait()
+        for index in range(2000):
+            counter.inc(path=f'/{offset}/{index % 50}')
+            histogram.observe(0.01, path=f'/{offset}/{index % 50}')
+
+    threads = [threading.Thread(target=writer, args=(offset,)) for offset in range(4)]
+    for thread in threads:
+        thread.start()
+    started.wait()
+    for _ in range(50):
+        registry.render()
+        registry.summary()
+    for thread in threads:
+        thread.join()
+
+    assert sum(counter.value(path=f'/{offset}/{index}') for offset in range(4) for index in range(50)) == 8000
+    assert sum(count for count, _ in histogram.totals().values()) == 8000
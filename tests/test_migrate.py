@@ -0,0 +1,58 @@
+import sqlite3
+from models import DatabaseManager
+
+
+def make_legacy(path: str):
+    DatabaseManager('sqlite:///' + path).engine.dispose()
+    db = sqlite3.connect(path)
+    db.execute("PRAGMA foreign_keys=OFF")
+    ddl = db.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'match'").fetchone()[0]
+    db.execute("DROP TABLE match")
+    db.execute(ddl.replace('ON DELETE CASCADE', ''))
+    db.execute("INSERT INTO event (id, name) VALUES (1, 'Major')")
+    db.execute("INSERT INTO user (id) VALUES (1)")
+    db.execute("INSERT INTO match (id, event_id, url, format, ongoing, notified) VALUES (1, 1, 'a', 'bo3', 0, 0)")
+    db.execute("INSERT INTO match (id, event_id, url, format, ongoing, notified) VALUES (2, 99, 'b', 'bo3', 0, 0)")
+    db.execute("INSERT INTO stream (match_id, link, name) VALUES (2, 'https://twitch.tv/x', 'x')")
+    db.execute("INSERT INTO user_event_subscription (user_id, event_id) VALUES (1, 1), (7, 1)")
+    db.commit()
+    db.close()
+
+
+def test_migrate_backs_up_and_cleans_legacy_database(tmp_path):
+    path = str(tmp_path / 'app.db')
+    make_legacy(path)
+
+    manager = DatabaseManager('sqlite:///' + path)
+    with manager.engine.connect() as connection:
+        foreign_keys = connection.exec_driver_sql('PRAGMA foreign_key_list("match")').all()
+        assert [row[6] for row in foreign_keys if row[2] == 'event'] == ['CASCADE']
+        assert connection.exec_driver_sql("SELECT id FROM match").scalars().all() == [1]
+        assert connection.exec_driver_sql("SELECT COUNT(*) FROM stream").scalar() == 0
+        assert connection.exec_driver_sql("SELECT user_id FROM user_event_subscription").scalars().all() == [1]
+    manager.engine.dispose()
+
+    backups = list(tmp_path.glob('app.db.*.bak'))
+    assert len(backups) == 1
+    backup = sqlite3.connect(backups[0])
+    assert backup.execute("SELECT COUNT(*) FROM match").fetchone()[0] == 2
+    backup.close()
+
+
+def test_migrate_leaves_clean_database_alone(tmp_path):
+    path = str(tmp_path / 'app.db')
+    DatabaseManager('sqlite:///' + path).engine.dispose()
+    DatabaseManager('sqlite:///' + path).engine.dispose()
+    assert list(tmp_path.glob('*.bak')) == []
+
+
+def test_export_sqlite_includes_commits_still_in_the_wal(manager, tmp_path):
+    manager.create_user(42)
+    with manager.engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == 'wal'
+        path = manager.export_sqlite(str(tmp_path / 'copy.db'))
+        db = sqlite3.connect(path)
+        try:
+            assert db.execute("SELECT id FROM user").fetchall() == [(42,)]
+        finally:
+            db.close()
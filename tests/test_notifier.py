@@ -0,0 +1,101 @@
+import asyncio
+import time
+from aiogram.exceptions import TelegramForbiddenError, TelegramRetryAfter
+from aiogram.methods import SendMessage
+from notifier import DeliveryStats, Notifier, TokenBucket
+
+
+class FakeBot:
+    def __init__(self, errors: dict[int, list[Exception]] | None = None):
+        self.errors = errors or {}
+        self.calls: list[int] = []
+        self.sent: list[tuple[int, float]] = []
+
+    async def send_message(self, chat_id, text, reply_markup=None):
+        self.calls.append(chat_id)
+        errors = self.errors.get(chat_id)
+        if errors:
+            raise errors.pop(0)
+        self.sent.append((chat_id, time.monotonic()))
+
+
+def method(chat_id: int) -> SendMessage:
+    return SendMessage(chat_id=chat_id, text='test')
+
+
+def test_token_bucket_allows_a_burst_then_throttles():
+    async def scenario():
+        bucket = TokenBucket(rate=50, capacity=5)
+        burst = [await bucket.acquire() for _ in range(5)]
+        started = time.monotonic()
+        throttled = [await bucket.acquire() for _ in range(5)]
+        return burst, throttled, time.monotonic() - started
+
+    burst, throttled, elapsed = asyncio.run(scenario())
+    assert burst == [False] * 5
+    assert all(throttled)
+    assert elapsed >= 5 / 50 * 0.9
+
+
+def test_token_bucket_pause_delays_acquire():
+    async def scenario():
+        bucket = TokenBucket(rate=100)
+        bucket.pause(0.1)
+        started = time.monotonic()
+        waited = await bucket.acquire()
+        return waited, time.monotonic() - started
+
+    waited, elapsed = asyncio.run(scenario())
+    assert waited
+    assert elapsed >= 0.09
+
+
+def test_retry_after_pauses_and_retries():
+    bot = FakeBot({1: [TelegramRetryAfter(method(1), 'Flood', 0.1)]})
+    notifier = Notifier(bot, chat_interval=0, global_rate=100)
+    stats = DeliveryStats()
+
+    async def scenario():
+        started = time.monotonic()
+        failures = await notifier.send('text', None, [1, 2], stats)
+        return failures, started
+
+    failures, started = asyncio.run(scenario())
+    assert failures == []
+    assert stats.sent == 2 and stats.failed == 0 and stats.throttled >= 1
+    assert bot.calls.count(1) == 2
+    retried_at = dict(bot.sent)[1]
+    assert retried_at - started >= 0.09
+
+
+def test_forbidden_is_a_permanent_failure_without_retry():
+    bot = FakeBot({2: [TelegramForbiddenError(method(2), 'bot was blocked by the user')]})
+    notifier = Notifier(bot, chat_interval=0, global_rate=100)
+    stats = DeliveryStats()
+
+    failures = asyncio.run(notifier.send('text', None, [1, 2, 3], stats))
+    assert [(chat_id, permanent) for chat_id, _, permanent in failures] == [(2, True)]
+    assert bot.calls.count(2) == 1
+    assert stats.sent == 2 and stats.failed == 1
+
+
+def test_messages_to_one_chat_are_spaced():
+    bot = FakeBot()
+    notifier = Notifier(bot, chat_interval=0.05, global_rate=100)
+
+    asyncio.run(notifier.send('text', None, [7, 7, 8], DeliveryStats()))
+    times = [sent_at for chat_id, sent_at in bot.sent if chat_id == 7]
+    assert len(times) == 2
+    assert times[1] - times[0] >= 0.045
+
+
+def test_on_result_reports_each_send_as_it_finishes():
+    bot = FakeBot({2: [TelegramForbiddenError(method(2), 'bot was blocked by the user')]})
+    notifier = Notifier(bot, workers=1, chat_interval=0, global_rate=100)
+    results = []
+
+    async def on_result(chat_id, failure):
+        results.append((chat_id, failure is not None, len(bot.calls)))
+
+    asyncio.run(notifier.send('text', None, [1, 2, 3], DeliveryStats(), on_result=on_result))
+    assert results == [(1, False, 1), (2, True, 2), (3, False, 3)]
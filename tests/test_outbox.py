@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import insert, select
+from models import NotificationOutbox, OUTBOX_PENDING, OUTBOX_SENT, OUTBOX_FAILED
+
+
+def outbox(manager) -> dict[int, tuple[str, int]]:
+    with manager.SessionLocal() as db:
+        return {row.user_id: (row.status, row.attempts) for row in db.scalars(select(NotificationOutbox))}
+
+
+def test_enqueue_notifications_queues_each_subscriber_once(seeded):
+    assert seeded.enqueue_notifications() == 3
+    assert set(outbox(seeded)) == {1, 2, 3}
+    assert seeded.enqueue_notifications() == 0
+
+
+def test_enqueue_notifications_tolerates_rows_queued_concurrently(seeded):
+    match_id = seeded.get_pending_matches()[0][0]
+    with seeded.engine.begin() as connection:
+        connection.execute(insert(NotificationOutbox), [{'match_id': match_id, 'user_id': 2,
+                                                        'status': OUTBOX_PENDING, 'attempts': 0,
+                                                        'created_at': datetime.now()}])
+    assert seeded.enqueue_notifications() == 2
+    assert set(outbox(seeded)) == {1, 2, 3}
+
+
+def test_outbox_sent_and_failed_transitions(seeded):
+    seeded.enqueue_notifications()
+    rows = {user_id: row_id for row_id, _, user_id in seeded.get_outbox_batch(10)}
+    seeded.mark_outbox_sent([rows[1]])
+    seeded.mark_outbox_failed([(rows[2], 'blocked', True), (rows[3], 'timeout', False)], max_attempts=2)
+    assert outbox(seeded) == {1: (OUTBOX_SENT, 1), 2: (OUTBOX_FAILED, 1), 3: (OUTBOX_PENDING, 1)}
+    assert [user_id for _, _, user_id in seeded.get_outbox_batch(10)] == [3]
+
+    seeded.mark_outbox_failed([(rows[3], 'timeout', False)], max_attempts=2)
+    assert outbox(seeded)[3] == (OUTBOX_FAILED, 2)
+    assert seeded.get_outbox_batch(10) == []
+    assert seeded.get_outbox_lag()[0] == 0
+
+
+def test_enqueue_recipients_skips_matches_already_notified(seeded):
+    match_id, _, _ = seeded.get_pending_matches()[0]
+    assert seeded.enqueue_recipients({match_id: [1, 2]}) == 2
+    assert seeded.enqueue_recipients({match_id: [1, 2, 3]}) == 0
+    assert set(outbox(seeded)) == {1, 2}
+
+
+def test_enqueue_recipients_tolerates_rows_queued_concurrently(seeded):
+    match_id, _, _ = seeded.get_pending_matches()[0]
+    with seeded.engine.begin() as connection:
+        connection.execute(insert(NotificationOutbox), [{'match_id': match_id, 'user_id': 2,
+                                                        'status': OUTBOX_PENDING, 'attempts': 0,
+                                                        'created_at': datetime.now()}])
+    seeded.enqueue_recipients({match_id: [1, 2, 3]})
+    assert set(outbox(seeded)) == {1, 2, 3}
+    assert seeded.get_pending_matches() == []
+
+
+def test_drain_outbox_exports_pending_and_lag(monkeypatch):
+    import bot
+    from config import Config
+    from metrics import registry
+
+    manager = bot.db_manager.manager
+    start = datetime.now(timezone.utc) + timedelta(days=1)
+    event = manager.create_event('Drain Cup', start, start + timedelta(days=1))
+    for user_id in (101, 102):
+        manager.create_user(user_id)
+        manager.subscribe_user_to_event(user_id, event.id)
+    manager.create_match('Drain Cup', ['Alpha', 'Beta'], 'https://www.hltv.org/matches/9/drain', 'bo1', True, start)
+    assert manager.enqueue_notifications() == 2
+
+    sent = []
+
+    async def send_message(chat_id, text, reply_markup=None):
+        sent.append(chat_id)
+
+    monkeypatch.setattr(bot.bot, 'send_message', send_message)
+    monkeypatch.setattr(bot.notifier, 'chat_interval', 0)
+    monkeypatch.setattr(Config, 'OUTBOX_BATCH_SIZE', 1)
+
+    assert asyncio.run(bot.drain_outbox()) == 1
+    lines = registry.render().splitlines()
+    assert 'outbox_pending 1' in lines
+    lag = [line for line in lines if line.startswith('outbox_lag_seconds ')]
+    assert len(lag) == 1 and float(lag[0].split()[1]) >= 0
+    assert len(sent) == 1
@@ -0,0 +1,75 @@
+import pytest
+import legacy_parser
+import parser
+from conftest import read_fixture
+
+CASES = (
+    ('get_all_upcoming_matches', 'matches.html'),
+    ('get_live_matches', 'matches.html'),
+    ('get_teams', 'ranking.html'),
+    ('get_stream_urls', 'match.html'),
+    ('get_all_events', 'events.html'),
+)
+
+
+@pytest.mark.parametrize('name, fixture', CASES)
+def test_lxml_parser_matches_bs4(name, fixture):
+    html_content = read_fixture(fixture)
+    expected = getattr(legacy_parser, name)(html_content)
+    assert expected
+    assert getattr(parser, name)(html_content) == expected
+
+
+def test_parse_matches_page_matches_separate_parsers():
+    html_content = read_fixture('matches.html')
+    page = parser.parse_matches_page(html_content)
+    assert [match.as_dict() for match in page.upcoming] == legacy_parser.get_all_upcoming_matches(html_content)
+    assert [match.as_dict() for match in page.live] == legacy_parser.get_live_matches(html_content)
+
+
+def test_parse_matches_page_runs_only_requested_extractors():
+    page = parser.parse_matches_page(read_fixture('matches.html'), extractors=('live',))
+    assert page.live
+    assert page.upcoming == []
+
+
+RANKING = '''<html><body><div class="ranking">
+<div class="ranked-team standard-box"><span class="name">Exact</span></div>
+<div class="standard-box ranked-team"><span class="name">Reordered</span></div>
+<div class="ranked-team standard-box hidden"><span class="name">Extra</span></div>
+<div class="ranked-team"><span class="name">Partial</span></div>
+</div></body></html>'''
+
+
+def test_multi_class_match_differs_from_bs4():
+    # bs4 compares a multi-class filter with the literal class attribute, _cls() matches class tokens
+    assert legacy_parser.get_teams(RANKING) == ['Exact']
+    assert parser.get_teams(RANKING) == ['Exact', 'Reordered', 'Extra']
+
+
+def test_cls_matches_whole_tokens_only():
+    root = parser.parse_html('<div class="ranked-teams"></div><div class="xranked-team"></div>'
+                             '<div class=" ranked-team\tstandard-box "></div>')
+    assert len(root.xpath('//' + parser._cls('div', 'ranked-team'))) == 1
+
+
+def test_get_all_events_counts_parsed_and_skipped_rows():
+    html_content = read_fixture('events.html')
+    stats = parser.EventsParseStats()
+    events = parser.get_all_events(html_content, stats)
+    skipped = sum(stats.skipped.values())
+    assert sum(stats.parsed.values()) == len(events)
+
+    broken = html_content.replace('data-unix=', 'data-broken=', 1)
+    stats = parser.EventsParseStats()
+    assert len(parser.get_all_events(broken, stats)) == len(events) - 1
+    assert sum(stats.skipped.values()) == skipped + 1
+
+
+def test_get_all_events_is_independent_of_chunk_size(monkeypatch):
+    html_content = read_fixture('events.html')
+    expected = parser.get_all_events(html_content)
+    monkeypatch.setattr(parser, 'EVENTS_CHUNK_SIZE', 37)
+    stats = parser.EventsParseStats()
+    assert parser.get_all_events(html_content, stats) == expected
+    assert sum(stats.parsed.values()) == len(expected)
@@ -0,0 +1,64 @@
+import asyncio
+from models import AsyncDatabaseManager
+from profiles import ProfileCache
+
+
+def run_with_profiles(manager, scenario, **kwargs):
+    db_manager = AsyncDatabaseManager(manager, workers=1)
+    profiles = ProfileCache(db_manager, **kwargs)
+    try:
+        return asyncio.run(scenario(profiles)), profiles
+    finally:
+        db_manager.close()
+
+
+def test_profile_is_cached_and_updated_on_write(seeded):
+    event_id = seeded.get_all_events()[0].id
+
+    async def scenario(profiles):
+        first = await profiles.get(2)
+        await profiles.subscribe_to_event(2, event_id)
+        await profiles.set_timezone(2, 3)
+        return first, await profiles.get(2)
+
+    (first, second), profiles = run_with_profiles(seeded, scenario)
+    assert second is first
+    assert event_id in second.event_ids and second.time_zone == 3
+    assert profiles.stats() == {'hits': 1, 'misses': 1, 'size': 1}
+    assert seeded.get_user_profile(2)[0] == 3
+
+
+def test_admin_revocation_takes_effect_immediately(seeded):
+    async def scenario(profiles):
+        await profiles.set_admin(1)
+        granted = await profiles.is_admin(1)
+        await profiles.set_admin(1, False)
+        return granted, await profiles.is_admin(1)
+
+    (granted, revoked), _ = run_with_profiles(seeded, scenario)
+    assert granted is True
+    assert revoked is False
+
+
+def test_expired_and_evicted_profiles_are_reloaded(seeded):
+    async def scenario(profiles):
+        for user_id in (1, 2, 3):
+            await profiles.get(user_id)
+        await profiles.get(1)
+        return profiles.stats()
+
+    stats, _ = run_with_profiles(seeded, scenario, max_entries=2)
+    assert stats == {'hits': 0, 'misses': 4, 'size': 2}
+
+    stats, _ = run_with_profiles(seeded, scenario, ttl=0)
+    assert stats['hits'] == 0
+
+
+def test_unknown_user_is_not_cached(seeded):
+    async def scenario(profiles):
+        profile = await profiles.get(999)
+        return profile, profiles.stats()
+
+    (profile, stats), _ = run_with_profiles(seeded, scenario)
+    assert profile.is_admin is False and not profile.event_ids
+    assert stats['size'] == 0
@@ -0,0 +1,131 @@
+import asyncio
+import time
+from scheduler import Scheduler
+
+
+def run_scheduler(scheduler: Scheduler, scenario):
+    async def main():
+        runner = asyncio.create_task(scheduler.run())
+        try:
+            await scenario()
+        finally:
+            runner.cancel()
+
+    asyncio.run(main())
+
+
+def test_jobs_run_in_time_order_and_one_shots_are_dropped():
+    scheduler = Scheduler(min_interval=0, jitter=0)
+    calls = []
+
+    def job(name):
+        async def callback():
+            calls.append(name)
+        return callback
+
+    async def scenario():
+        now = time.time()
+        scheduler.schedule('match:b', now + 0.04, job('b'))
+        scheduler.schedule('match:a', now + 0.02, job('a'))
+        scheduler.schedule('match:c', now + 0.06, job('c'))
+        scheduler.cancel('match:c')
+        await asyncio.sleep(0.15)
+
+    run_scheduler(scheduler, scenario)
+    assert calls == ['a', 'b']
+    assert scheduler.pending() == []
+
+
+def test_recurring_job_uses_returned_delay():
+    scheduler = Scheduler(min_interval=0, jitter=0)
+    runs = []
+
+    async def callback():
+        runs.append(time.time())
+        return 0.02
+
+    async def scenario():
+        scheduler.every('live', 10, callback)
+        await asyncio.sleep(0.15)
+
+    run_scheduler(scheduler, scenario)
+    assert len(runs) >= 3
+    assert scheduler.pending() == ['live']
+
+
+def test_cancel_while_running_stops_recurring_job():
+    scheduler = Scheduler(min_interval=0, jitter=0)
+    runs = []
+
+    async def callback():
+        runs.append(1)
+        scheduler.cancel('matches')
+        await asyncio.sleep(0.01)
+
+    async def scenario():
+        scheduler.every('matches', 0.01, callback)
+        await asyncio.sleep(0.1)
+
+    run_scheduler(scheduler, scenario)
+    assert runs == [1]
+    assert scheduler.pending() == []
+
+
+def test_rescheduling_while_running_keeps_the_new_job():
+    scheduler = Scheduler(min_interval=0, jitter=0)
+    calls = []
+
+    async def later():
+        calls.append('later')
+
+    async def first():
+        calls.append('first')
+        scheduler.schedule('match:x', time.time() + 0.03, later)
+
+    async def scenario():
+        scheduler.schedule('match:x', time.time(), first)
+        await asyncio.sleep(0.1)
+
+    run_scheduler(scheduler, scenario)
+    assert calls == ['first', 'later']
+
+
+def test_rescheduling_at_the_same_time_keeps_one_heap_entry():
+    scheduler = Scheduler(min_interval=0, jitter=0)
+
+    async def callback():
+        pass
+
+    when = time.time() + 60
+    for _ in range(100):
+        scheduler.schedule('match:a', when, callback)
+    assert len(scheduler._heap) == 1
+
+    for offset in range(100):
+        scheduler.schedule('match:a', when + offset, callback)
+    assert scheduler.pending() == ['match:a']
+    assert len(scheduler._heap) <= 2 * len(scheduler._jobs) + 16
+
+
+def test_job_due_while_its_key_runs_is_deferred_without_spinning():
+    scheduler = Scheduler(min_interval=0, jitter=0)
+    calls = []
+
+    async def slow():
+        calls.append('slow')
+        await asyncio.sleep(0.1)
+        calls.append('slow done')
+
+    async def again():
+        calls.append('again')
+
+    async def scenario():
+        scheduler.schedule('match:a', time.time(), slow)
+        await asyncio.sleep(0.02)
+        scheduler.schedule('match:a', time.time(), again)
+        await asyncio.sleep(0.2)
+        assert calls == ['slow', 'slow done']
+        await asyncio.sleep(1)
+
+    run_scheduler(scheduler, scenario)
+    assert calls == ['slow', 'slow done', 'again']
@@ -0,0 +1,47 @@
+from subscribers import SubscriberIndex
+
+
+def build(event_pairs=(), team_pairs=()) -> SubscriberIndex:
+    index = SubscriberIndex()
+    index.load(event_pairs, team_pairs)
+    return index
+
+
+def test_recipients_merge_event_and_team_subscribers():
+    index = build(event_pairs=[(10, 1), (10, 2), (11, 3)], team_pairs=[(20, 2), (20, 4), (21, 5)])
+    assert index.recipients(10, [20]) == {1, 2, 4}
+    assert index.recipients(11, [21, 22]) == {3, 5}
+    assert index.recipients(12, []) == set()
+
+
+def test_add_and_remove_keep_the_index_consistent():
+    index = build(event_pairs=[(10, 1)])
+    version = index.version
+    assert index.add_event(3, 10)
+    assert not index.add_event(3, 10)
+    assert index.add_team(2, 20)
+    assert index.recipients(10, [20]) == {1, 2, 3}
+    assert index.remove_event(1, 10)
+    assert not index.remove_event(1, 10)
+    assert index.remove_team(2, 20)
+    assert not index.remove_team(2, 20)
+    assert index.recipients(10, [20]) == {3}
+    assert index.stats()['teams'] == 0
+    assert index.version > version
+
+
+def test_diff_and_replace():
+    stale = build(event_pairs=[(10, 1), (10, 2)], team_pairs=[(20, 3)])
+    fresh = build(event_pairs=[(10, 1)], team_pairs=[(20, 3), (20, 4), (21, 5)])
+    assert stale.diff(fresh) == {'missing': 2, 'extra': 1}
+    version = stale.version
+    stale.replace(fresh)
+    assert stale.diff(fresh) == {'missing': 0, 'extra': 0}
+    assert stale.recipients(10, [20, 21]) == {1, 3, 4, 5}
+    assert stale.version == version + 1
+
+
+def test_index_matches_database_recipients(seeded):
+    index = build(*seeded.get_subscription_pairs())
+    match_id, event_id, team_ids = seeded.get_pending_matches()[0]
+    assert index.recipients(event_id, team_ids) == {1, 2, 3}
@@ -0,0 +1,17 @@
+from parser import LiveMatch, MatchesPage
+from tracker import LiveTracker
+
+
+def page(*urls: str) -> MatchesPage:
+    return MatchesPage(live=[LiveMatch(url=url, event='Major', format='bo3', teams=('NAVI', 'FaZe')) for url in urls])
+
+
+def test_diff_is_repeated_until_committed():
+    tracker = LiveTracker()
+    assert [match.url for match in tracker.diff(page('/a')).added] == ['/a']
+    assert [match.url for match in tracker.diff(page('/a')).added] == ['/a']
+
+    tracker.commit(page('/a'))
+    assert not tracker.diff(page('/a'))
+    diff = tracker.diff(page('/b'))
+    assert [match.url for match in diff.added] == ['/b'] and diff.removed == ['/a']
@@ -0,0 +1,51 @@
+import time
+from dataclasses import dataclass, field
+from parser import LiveMatch, MatchesPage
+
+
+@dataclass(slots=True)
+class LiveDiff:
+    added: list[LiveMatch] = field(default_factory=list)
+    changed: list[LiveMatch] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+    def __str__(self):
+        return f"{len(self.added)} added, {len(self.changed)} changed, {len(self.removed)} removed"
+
+
+class LiveTracker:
+    def __init__(self, fast: float = 60, normal: float = 120, slow: float = 600, soon_window: float = 900):
+        self.fast = fast
+        self.normal = normal
+        self.slow = slow
+        self.soon_window = soon_window
+        self._snapshot: dict[str, tuple[LiveMatch, dict]] = {}
+
+    @staticmethod
+    def _states(page: MatchesPage) -> dict[str, tuple[LiveMatch, dict]]:
+        return {match.url: (match, page.stream_hints.get(match.url, {})) for match in page.live}
+
+    def diff(self, page: MatchesPage) -> LiveDiff:
+        diff = LiveDiff()
+        snapshot = self._states(page)
+        for url, state in snapshot.items():
+            previous = self._snapshot.get(url)
+            if previous is None:
+                diff.added.append(state[0])
+            elif previous != state:
+                diff.changed.append(state[0])
+        diff.removed = [url for url in self._snapshot if url not in snapshot]
+        return diff
+
+    def commit(self, page: MatchesPage):
+        self._snapshot = self._states(page)
+
+    def next_interval(self, next_start: float | None) -> float:
+        if next_start is not None and next_start - time.time() <= self.soon_window:
+            return self.fast
+        if self._snapshot:
+            return self.normal
+        return self.slow